@@ -3,6 +3,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from mmm_python import *
+from mmm_python import MBufAnalysis
 import matplotlib.pyplot as plt
 import numpy as np
 import librosa
@@ -14,7 +14,7 @@ from mmm_python import *
 
 from mmm_python.GUI import Handle, ControlSpec
 from mmm_python import *
-from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QCheckBox
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox
 
 
 app = QApplication([])
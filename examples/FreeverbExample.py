@@ -18,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from mmm_python import *
 
 from mmm_python import *
+from mmm_python.GUI import Handle, ControlSpec
 from PySide6.QtWidgets import *
 
 def main():
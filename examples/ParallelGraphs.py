@@ -4,6 +4,10 @@ MMMAudio can run multiple graphs in parallel, each in its own process. This exam
 """
 
 from mmm_python import *
+
+# compile once up front, so the four processes below load the cached graph instead of compiling it four times
+MMMAudio.precompile(["ParallelGraphs"])
+
 m_s = []
 for i in range(4):
     m_s.append(MMMAudio(128, graph_name=
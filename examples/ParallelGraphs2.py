@@ -4,6 +4,11 @@ MMMAudio can run multiple graphs in parallel, each in its own process and very l
 
 from mmm_python import *
 
+# compile all three graphs at the same time, so the rig is ready in the time of the slowest compile
+MMMAudio.precompile(["ManyOscillators", "MoogPops", "NessStretch"])
+
+# on Linux each instance can be pinned to its own core and given realtime priority, for example:
+# mmm_audio = MMMAudio(128, graph_name="ManyOscillators", package_name="examples", cpu_affinity=[2], realtime_priority=70)
 mmm_audio = MMMAudio(128, graph_name="ManyOscillators", package_name="examples")
 mmm_audio.start_audio()
 
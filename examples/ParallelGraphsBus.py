@@ -0,0 +1,31 @@
+"""
+Like ParallelGraphs.py, but the graphs share one output stream. Four worker processes render into a SummingBus in shared memory, and one master process owns the audio device, plays its own graph and adds the workers' blocks to it. This spreads the graphs over several cores while the sound card only sees a single low-latency client.
+"""
+
+from mmm_python import *
+
+MMMAudio.precompile(["ParallelGraphs"])
+
+bus = SummingBus(num_workers=4, blocksize=128)
+
+# the master opens the output device, so create it before the workers
+master = MMMAudio(128, graph_name="ParallelGraphs", package_name="examples", bus=bus)
+master.start_audio()
+master.send_float("pan", 0.0)
+
+workers = []
+for i in range(4):
+    workers.append(MMMAudio(128, graph_name="ParallelGraphs", package_name="examples", in_device=None, out_device=None, bus=bus, bus_slot=i))
+    workers[-1].start_audio()
+    workers[-1].send_float("pan", linlin(i, 0, 3, -1, 1))
+
+
+picker = Pxrand([0,1,2,3])
+def set_random_freq():
+    workers[picker.next()].send_float("freq", rrand(100, 600)) # set the frequency to a random value
+
+set_random_freq()
+
+# blocks the master had to play without each worker
+print([bus.misses(i) for i in range(4)])
+print(master.get_stats())
@@ -14,6 +14,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from mmm_python import *
+from mmm_python.GUI import Handle, ControlSpec
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
 
 def main():
 
@@ -16,6 +16,7 @@ from pathlib import Path
 # If you want to run it line by line in a REPL, skip this line!
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from mmm_python import *
+from mmm_python import OSCServer
 
 def main():
     mmm_audio = MMMAudio(128, graph_name="PlayExample", package_name="examples")
@@ -16,7 +16,8 @@ from pathlib import Path
 # If you want to run it line by line in a REPL, skip this line!
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from mmm_python import *
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QSlider, QPushButton, QLabel, QLineEdit, QFileDialog
+from mmm_python.GUI import Handle, ControlSpec
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QSlider, QPushButton, QLabel, QLineEdit, QFileDialog
 from PySide6.QtCore import Qt
 
 def open_save_dialog(parent: QWidget) -> str:
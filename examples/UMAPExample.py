@@ -3,6 +3,7 @@ from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from mmm_python import *
+from mmm_python import MBufAnalysis, MPlot
 from umap import UMAP
 from sklearn.neighbors import KDTree
 
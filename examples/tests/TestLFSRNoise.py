@@ -4,6 +4,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from mmm_python import *
+from mmm_python.GUI import Handle, ControlSpec
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
 
 def run_gui():
     mmm_audio = MMMAudio(128, graph_name="TestLFSRNoise", package_name="examples.tests")
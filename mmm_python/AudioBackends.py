@@ -0,0 +1,263 @@
+"""
+Audio backends drive the engine in the audio process of MMMAudio: they decide the sample rate and channel counts and call the audio callbacks once per block.
+"""
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Callable, Optional
+
+from mmm_python.EngineStats import PA_OUTPUT_UNDERFLOW
+
+# Return flag of the audio callbacks (pyaudio.paContinue)
+PA_CONTINUE = 0
+
+DeviceConfig = namedtuple("DeviceConfig", ["sample_rate", "num_input_channels", "num_output_channels", "duplex", "resample_input"])
+DeviceConfig.__doc__ = """What a backend opened: the sample rate, the number of input and output channels, whether input arrives with the output callback (duplex), and whether it comes from a separately clocked stream and has to be resampled."""
+
+
+class AudioBackend(ABC):
+    """Interface between the audio process and whatever calls the audio callbacks.
+
+    The audio process first calls `configure` to learn the sample rate and channel counts, builds the engine, and then calls `start` with two callbacks that have the PyAudio callback signature `(in_data, frame_count, time_info, status) -> (out_data, flag)`:
+
+    - `output_callback` renders one block. `in_data` holds the matching input block in duplex mode and is None otherwise.
+    - `input_callback` receives input from a separately clocked input stream.
+
+    `status` uses the PortAudio flags (see `EngineStats`), so every backend shares the same xrun accounting. Backends are pickled into the audio process, so they should not hold any resources before `start`.
+    """
+
+    @abstractmethod
+    def configure(self, in_device: Optional[str], out_device: Optional[str], num_input_channels: int, num_output_channels: int, duplex: bool) -> Optional[DeviceConfig]:
+        """Pick the devices and return their configuration, or None if they can't be used."""
+
+    @abstractmethod
+    def start(self, blocksize: int, output_callback: Callable, input_callback: Callable, active: Optional[threading.Event] = None):
+        """Start calling the callbacks.
+
+        `active` is set while the audio process is playing. The callbacks return silence while it is clear, so a backend that drives itself can wait on it instead of calling them.
+        """
+
+    @abstractmethod
+    def stop(self):
+        """Stop calling the callbacks and release the devices."""
+
+
+class PyAudioBackend(AudioBackend):
+    """Plays through PortAudio with PyAudio. This is the default backend."""
+
+    def __init__(self):
+        self.p = None
+        self.streams = []
+        self.in_device_index = None
+        self.out_device_index = None
+        self.config = None
+
+    @staticmethod
+    def _device_info(p, device_name: str, is_input: bool):
+        if device_name != "default":
+            for i in range(p.get_device_count()):
+                dev_info = p.get_device_info_by_index(i)
+                if device_name in dev_info['name']:
+                    return dev_info
+            print(f"[PID {os.getpid()}] Device '{device_name}' not found, using default")
+
+        if is_input:
+            return p.get_default_input_device_info()
+        else:
+            return p.get_default_output_device_info()
+
+    def configure(self, in_device, out_device, num_input_channels, num_output_channels, duplex):
+        if in_device is None and out_device is None:
+            self.config = DeviceConfig(48000, 0, 0, False, False)
+            return self.config
+
+        import pyaudio
+
+        p_temp = pyaudio.PyAudio()
+        in_device_info = self._device_info(p_temp, in_device, True) if in_device is not None else None
+        out_device_info = self._device_info(p_temp, out_device, False) if out_device is not None else None
+        p_temp.terminate()
+
+        if in_device_info is not None and out_device_info is not None:
+            if in_device_info['defaultSampleRate'] != out_device_info['defaultSampleRate']:
+                print(f"[PID {os.getpid()}] Sample rate mismatch!")
+                sys.stdout.flush()
+                return None
+
+        device_info = in_device_info if in_device_info is not None else out_device_info
+        sample_rate = int(device_info['defaultSampleRate'])
+
+        input_channels = 0
+        output_channels = 0
+        if in_device_info is not None:
+            self.in_device_index = in_device_info['index']
+            input_channels = min(num_input_channels, int(in_device_info['maxInputChannels']))
+        if out_device_info is not None:
+            self.out_device_index = out_device_info['index']
+            output_channels = min(num_output_channels, int(out_device_info['maxOutputChannels']))
+
+        both = in_device_info is not None and out_device_info is not None
+        # a PyAudio duplex stream has one channel count for input and output
+        use_duplex = (
+            duplex and both
+            and self.in_device_index == self.out_device_index
+            and input_channels == output_channels
+        )
+        self.config = DeviceConfig(sample_rate, input_channels, output_channels, use_duplex, both and not use_duplex)
+        return self.config
+
+    def start(self, blocksize, output_callback, input_callback, active=None):
+        # the sound card keeps its own clock, so the callbacks run regardless
+        config = self.config
+        if not (config.duplex or config.num_input_channels > 0 or config.num_output_channels > 0):
+            # no devices, so PortAudio isn't initialized at all
+            return
+
+        import pyaudio
+
+        self.p = pyaudio.PyAudio()
+        format_code = pyaudio.paFloat32
+
+        if config.duplex:
+            self.streams.append(self.p.open(
+                format=format_code,
+                channels=config.num_output_channels,
+                rate=config.sample_rate,
+                input=True,
+                output=True,
+                input_device_index=self.in_device_index,
+                output_device_index=self.out_device_index,
+                frames_per_buffer=blocksize,
+                stream_callback=output_callback
+            ))
+        else:
+            if config.num_input_channels > 0:
+                self.streams.append(self.p.open(
+                    format=format_code,
+                    channels=config.num_input_channels,
+                    rate=config.sample_rate,
+                    input=True,
+                    input_device_index=self.in_device_index,
+                    frames_per_buffer=blocksize,
+                    stream_callback=input_callback
+                ))
+
+            if config.num_output_channels > 0:
+                self.streams.append(self.p.open(
+                    format=format_code,
+                    channels=config.num_output_channels,
+                    rate=config.sample_rate,
+                    output=True,
+                    output_device_index=self.out_device_index,
+                    frames_per_buffer=blocksize,
+                    stream_callback=output_callback
+                ))
+
+        for stream in self.streams:
+            stream.start_stream()
+
+    def stop(self):
+        for stream in self.streams:
+            stream.stop_stream()
+            stream.close()
+        self.streams = []
+        if self.p is not None:
+            self.p.terminate()
+            self.p = None
+
+
+class NullBackend(AudioBackend):
+    """A virtual device with no sound card, for headless benchmarking and soak tests.
+
+    A thread calls the output callback once per block, either paced by a high-resolution timer at the configured sample rate or as fast as possible. Input is silent and arrives with the output callback, as in duplex mode. When pacing in realtime, a block that starts more than one block period late is reported as an output underflow, so `MMMAudio.get_stats` counts xruns exactly as it does with a real device.
+
+    Example:
+        ```python
+        mmm_audio = MMMAudio(128, graph_name="Grains", backend=NullBackend(realtime=True))
+        mmm_audio.start_audio()
+        time.sleep(60)
+        print(mmm_audio.get_stats())
+        ```
+    """
+
+    # sleep until this long before a block is due, then spin for accuracy
+    SPIN_TIME = 0.0005
+
+    def __init__(self, sample_rate: int = 48000, realtime: bool = True):
+        """Create the backend.
+
+        Args:
+            sample_rate: Sample rate of the virtual device.
+            realtime: If True, blocks are paced at the sample rate. If False, blocks are rendered back to back as fast as possible.
+        """
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.config = None
+        self._stop = None
+        self._thread = None
+
+    def configure(self, in_device, out_device, num_input_channels, num_output_channels, duplex):
+        input_channels = num_input_channels if in_device is not None else 0
+        output_channels = num_output_channels if out_device is not None else 0
+        self.config = DeviceConfig(self.sample_rate, input_channels, output_channels, input_channels > 0, False)
+        return self.config
+
+    # how often a stopped engine checks whether it should exit
+    IDLE_POLL = 0.1
+
+    def start(self, blocksize, output_callback, input_callback, active=None):
+        if self.config.num_output_channels == 0:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(blocksize, output_callback, active), daemon=True)
+        self._thread.start()
+
+    def _run(self, blocksize: int, output_callback: Callable, active: Optional[threading.Event]):
+        period = blocksize / self.sample_rate
+        in_data = bytes(blocksize * self.config.num_input_channels * 4) if self.config.num_input_channels > 0 else None
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            if active is not None and not active.is_set():
+                # nothing to render: wait instead of spinning on silent blocks
+                active.wait(self.IDLE_POLL)
+                next_time = time.perf_counter()
+                continue
+            status = 0
+            if self.realtime:
+                now = time.perf_counter()
+                remaining = next_time - now
+                if remaining > self.SPIN_TIME:
+                    time.sleep(remaining - self.SPIN_TIME)
+                if remaining > 0.0:
+                    while time.perf_counter() < next_time:
+                        pass
+                elif -remaining > period:
+                    # a whole block late: the device would have run dry
+                    status = PA_OUTPUT_UNDERFLOW
+                    next_time = now
+                next_time += period
+            output_callback(in_data, blocksize, None, status)
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+def make_backend(backend) -> AudioBackend:
+    """Turn the `backend` option of MMMAudio into a backend instance.
+
+    Args:
+        backend: An `AudioBackend`, or one of the names "pyaudio" and "null".
+    """
+    if isinstance(backend, AudioBackend):
+        return backend
+    if backend == "pyaudio":
+        return PyAudioBackend()
+    if backend == "null":
+        return NullBackend()
+    raise ValueError(f"Unknown audio backend: {backend}")
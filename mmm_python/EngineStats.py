@@ -0,0 +1,184 @@
+"""
+Realtime telemetry of the audio engine, written by the audio process into shared memory and read by the main process without any IPC round-trip.
+"""
+import threading
+from typing import Optional
+
+import numpy as np
+
+from mmm_python.SharedArray import SharedArray
+
+# PortAudio callback status flags (see portaudio.h)
+PA_INPUT_UNDERFLOW = 1
+PA_INPUT_OVERFLOW = 2
+PA_OUTPUT_UNDERFLOW = 4
+PA_OUTPUT_OVERFLOW = 8
+
+# Slots of the stats array
+BLOCKS = 0             # blocks rendered by the output callback
+BLOCK_TIME_SUM = 1     # seconds spent in the engine
+BLOCK_TIME_MAX = 2
+LAST_BLOCK_TIME = 3
+DEADLINE = 4           # seconds of audio in one block
+XRUNS = 5              # output underflows reported by PortAudio
+OUTPUT_OVERFLOWS = 6
+INPUT_OVERFLOWS = 7    # input the device had to drop
+DROPPED_INPUT = 8      # input blocks the engine could not use
+LAST_CALLBACK = 9      # perf_counter time of the previous callback
+JITTER_SUM = 10        # |callback interval - deadline|, summed
+JITTER_MAX = 11
+RESET_REQUEST = 12     # set by the main process, cleared by the audio process
+ENGINE_CLOCK = 13      # sample clock at the start of the current callback, written by the engine
+CLOCK = 14             # sample clock at the start of the last finished callback
+CLOCK_TIME = 15        # perf_counter time at the start of that block's callback
+NUM_SLOTS = 16
+
+# The histogram counts block times in bins of HIST_BIN_WIDTH of the deadline.
+# The last bin collects everything slower than HIST_RANGE deadlines.
+HIST_BINS = 200
+HIST_RANGE = 2.0
+HIST_BIN_WIDTH = HIST_RANGE / HIST_BINS
+
+
+class EngineStats:
+    """Per-block DSP load, xrun counts and a block-time histogram in shared memory.
+
+    The audio process is the only writer. It calls `record_block` after every rendered block and `record_status` with the status flags PortAudio passes to each callback. With separate input and output streams the counters are updated from two callback threads, so the counters both threads touch are updated under a lock, which is only taken when there is something to count. The main process reads the numbers at any time with `snapshot`, which is what `MMMAudio.get_stats` returns. Reads are not synchronized with the writer, so a snapshot can be one block out of date, which doesn't matter for monitoring.
+    """
+
+    def __init__(self, shared: Optional[SharedArray] = None):
+        """Create the stats in a new shared-memory segment, or use an existing one.
+
+        Args:
+            shared: The `shared` attribute of an `EngineStats` created in another process. If None, a new segment is created.
+        """
+        self.shared = shared if shared is not None else SharedArray(NUM_SLOTS + HIST_BINS, dtype=np.float64)
+        self.values = self.shared.array[:NUM_SLOTS]
+        self.histogram = self.shared.array[NUM_SLOTS:]
+        self._inv_bin = 0.0
+        self._lock = threading.Lock()
+
+    def set_deadline(self, blocksize: int, sample_rate: float):
+        """Set the time budget of one block. Called by the audio process once the sample rate is known."""
+        self.values[DEADLINE] = blocksize / sample_rate
+        self._inv_bin = 1.0 / (self.values[DEADLINE] * HIST_BIN_WIDTH)
+
+    def record_block(self, block_time: float, callback_time: float):
+        """Record one rendered block.
+
+        Args:
+            block_time: Seconds spent rendering the block.
+            callback_time: `time.perf_counter()` at the start of the callback, used to measure callback jitter.
+        """
+        values = self.values
+        if values[RESET_REQUEST] != 0.0:
+            with self._lock:
+                self._clear()
+
+        if values[LAST_CALLBACK] > 0.0:
+            jitter = abs(callback_time - values[LAST_CALLBACK] - values[DEADLINE])
+            values[JITTER_SUM] += jitter
+            if jitter > values[JITTER_MAX]:
+                values[JITTER_MAX] = jitter
+        values[LAST_CALLBACK] = callback_time
+        values[CLOCK] = values[ENGINE_CLOCK]
+        values[CLOCK_TIME] = callback_time
+
+        values[BLOCKS] += 1
+        values[BLOCK_TIME_SUM] += block_time
+        values[LAST_BLOCK_TIME] = block_time
+        if block_time > values[BLOCK_TIME_MAX]:
+            values[BLOCK_TIME_MAX] = block_time
+        self.histogram[min(int(block_time * self._inv_bin), HIST_BINS - 1)] += 1
+
+    def record_status(self, status: int):
+        """Count the xrun flags of a PortAudio callback status."""
+        if status:
+            values = self.values
+            with self._lock:
+                if status & PA_OUTPUT_UNDERFLOW:
+                    values[XRUNS] += 1
+                if status & PA_OUTPUT_OVERFLOW:
+                    values[OUTPUT_OVERFLOWS] += 1
+                if status & PA_INPUT_OVERFLOW:
+                    values[INPUT_OVERFLOWS] += 1
+
+    def record_dropped_input(self, blocks: int = 1):
+        """Count input blocks that could not be passed to the engine."""
+        with self._lock:
+            self.values[DROPPED_INPUT] += blocks
+
+    def _clear(self):
+        keep = self.values[[DEADLINE, ENGINE_CLOCK, CLOCK, CLOCK_TIME]]
+        self.shared.array[:] = 0.0
+        self.values[[DEADLINE, ENGINE_CLOCK, CLOCK, CLOCK_TIME]] = keep
+
+    @property
+    def clock_slot(self) -> np.ndarray:
+        """The slot the engine publishes its sample clock into, for handing to the Mojo bridge."""
+        return self.values[ENGINE_CLOCK:ENGINE_CLOCK + 1]
+
+    def sample_clock(self, sample_rate: float) -> int:
+        """The engine's sample clock now, extrapolated from the start of the last audio callback.
+
+        Args:
+            sample_rate: Sample rate of the engine.
+        """
+        import time
+
+        clock, clock_time = self.values[CLOCK], self.values[CLOCK_TIME]
+        if clock_time == 0.0:
+            return int(clock)
+        return int(clock + max(0.0, time.perf_counter() - clock_time) * sample_rate)
+
+    def reset(self):
+        """Ask the audio process to clear all counters before it records the next block."""
+        self.values[RESET_REQUEST] = 1.0
+
+    @staticmethod
+    def _percentile(hist: np.ndarray, total: float, q: float, deadline: float) -> float:
+        index = int(np.searchsorted(np.cumsum(hist), q * total))
+        # report the upper edge of the bin, in seconds
+        return min(index + 1, HIST_BINS) * HIST_BIN_WIDTH * deadline
+
+    def snapshot(self) -> dict:
+        """Read the current statistics.
+
+        Returns:
+            A dictionary with the number of `blocks` rendered, the mean and peak `dsp_load` in percent of the block deadline, the `p50_ms`, `p99_ms` and `max_ms` block times, the `deadline_ms` of one block, the `xruns` (output underflows), `input_overflows` and `dropped_input` counts, and the mean and max `jitter_ms` of the callback interval.
+        """
+        values = self.values.tolist()
+        hist = self.histogram.copy()
+        blocks = values[BLOCKS]
+        deadline = values[DEADLINE]
+
+        stats = {
+            "blocks": int(blocks),
+            "deadline_ms": deadline * 1000.0,
+            "dsp_load": 0.0,
+            "dsp_load_peak": 0.0,
+            "p50_ms": 0.0,
+            "p99_ms": 0.0,
+            "max_ms": values[BLOCK_TIME_MAX] * 1000.0,
+            "xruns": int(values[XRUNS]),
+            "output_overflows": int(values[OUTPUT_OVERFLOWS]),
+            "input_overflows": int(values[INPUT_OVERFLOWS]),
+            "dropped_input": int(values[DROPPED_INPUT]),
+            "jitter_ms": 0.0,
+            "jitter_max_ms": values[JITTER_MAX] * 1000.0,
+        }
+        if blocks > 0 and deadline > 0.0:
+            total = float(hist.sum())
+            stats["dsp_load"] = 100.0 * values[BLOCK_TIME_SUM] / (blocks * deadline)
+            stats["dsp_load_peak"] = 100.0 * values[BLOCK_TIME_MAX] / deadline
+            stats["p50_ms"] = min(self._percentile(hist, total, 0.5, deadline), values[BLOCK_TIME_MAX]) * 1000.0
+            stats["p99_ms"] = min(self._percentile(hist, total, 0.99, deadline), values[BLOCK_TIME_MAX]) * 1000.0
+            if blocks > 1:
+                stats["jitter_ms"] = 1000.0 * values[JITTER_SUM] / (blocks - 1)
+        return stats
+
+    def close(self):
+        """Release this process's mapping of the stats."""
+        self.values = None
+        self.histogram = None
+        self.shared.close()
@@ -4,7 +4,6 @@ Runs audio processing in a separate process on its own CPU core
 """
 import sys
 
-import pyaudio
 import numpy as np
 import ctypes
 from multiprocessing import Process, Value, Event, Queue, Array
@@ -12,24 +11,26 @@ from math import ceil
 from typing import Optional, Tuple, List
 from enum import IntEnum
 from collections import namedtuple
-import mojo.importer
 
 import signal
 
+from mmm_python.MessageRing import MessageRing, MsgType, ramp_values
+from mmm_python.SharedArray import SharedArray
+from mmm_python.EngineStats import EngineStats
+from mmm_python.SummingBus import SummingBus
+from mmm_python.MouseTracker import MouseTracker, graph_uses_mouse
+from mmm_python.AudioBackends import AudioBackend, NullBackend, PyAudioBackend
+
 
 class AudioCommand(IntEnum):
     STOP_PROCESS = 0
     START_AUDIO = 1
     STOP_AUDIO = 2
-    SEND_BOOL = 3
-    SEND_FLOAT = 4
-    SEND_FLOATS = 5
-    SEND_INT = 6
-    SEND_INTS = 7
-    SEND_TRIG = 8
-    SEND_STRING = 9
-    SEND_STRINGS = 10
-    GET_SAMPLES = 11
+    GET_SAMPLES = 3
+    SWAP_GRAPH = 4
+    SET_BLOCK_SIZE = 5
+    GET_PARAM_HANDLE = 6
+    UPLOAD_BUFFER = 7
 
 class MMMAudio:
     """
@@ -51,6 +52,8 @@ class MMMAudio:
             A named tuple containing two dictionaries: (in_devices, out_devices).
             Each dictionary maps device index to a list of [name, max_channels, sample_rate].
         """
+        import pyaudio
+
         p = pyaudio.PyAudio()
 
         ret_devices = namedtuple('Devices', ['in_devices', 'out_devices'])(dict(), dict())
@@ -87,7 +90,18 @@ class MMMAudio:
         out_device: str | None = "default",
         graph_name: str = "FeedbackDelays",
         package_name: str = "examples",
-        audio_init_timeout: float = 10.0
+        audio_init_timeout: float = 10.0,
+        message_ring_size: int = 1 << 20,
+        duplex: bool = True,
+        cpu_affinity: Optional[List[int]] = None,
+        realtime_priority: Optional[int] = None,
+        nice: Optional[int] = None,
+        isolate_audio_cores: bool = True,
+        bus: Optional[SummingBus] = None,
+        bus_slot: Optional[int] = None,
+        track_mouse: Optional[bool] = None,
+        backend: str | AudioBackend = "pyaudio",
+        control_block_size: Optional[int] = None
     ):
         """Initialize the MMMAudioProcess class.
         
@@ -100,16 +114,48 @@ class MMMAudio:
             graph_name: Name of the Mojo graph to use.
             package_name: Name of the package containing the Mojo graph.
             audio_init_timeout: Timeout for audio initialization in seconds.
+            message_ring_size: Size in bytes of the shared-memory ring that carries `send_*` messages to the audio process.
+            duplex: If True and input and output are the same device with the same number of channels, open one full-duplex stream so input and output share a callback and a clock. Otherwise input and output get separate streams and input is resampled to the output clock.
+            cpu_affinity: CPU cores the audio callback thread is pinned to, for example `[3]`. None lets the OS decide. Linux only.
+            realtime_priority: If set, the audio callback thread is switched to SCHED_FIFO with this priority (1-99). Needs rtprio permissions. Linux only.
+            nice: If set, the nice value of the audio callback thread (-20 to 19). Linux only.
+            isolate_audio_cores: If True and `cpu_affinity` is set, the command loop and other helper threads of the audio process are kept off the audio cores.
+            bus: A `SummingBus` shared with other instances. Without `bus_slot` this instance is the bus master: it owns the output device and adds every worker's output to its own. `blocksize` and `num_output_channels` must match the bus.
+            bus_slot: Makes this instance a worker on `bus` that renders into this slot instead of opening audio devices. It runs at the master's sample rate, so create the master first.
+            track_mouse: Whether to send the mouse position to the graph (`world[].mouse_x` and `world[].mouse_y`). None tracks it only if the graph's source mentions them.
+            backend: What drives the engine: "pyaudio" plays through the sound card, and "null" (or a configured `NullBackend`) runs without one, paced at the sample rate or as fast as possible, for headless benchmarks and soak tests.
+            control_block_size: Size of the control blocks the engine splits each device block into. Messages reach the graph at the top of every control block, so a large `blocksize` with a small `control_block_size` keeps the device efficient without coarsening control. Defaults to `blocksize`. Can be changed while running with `set_block_size`.
         """
+
+        if bus is not None:
+            # a mismatch would only show up as a broadcast error in the audio process
+            if blocksize != bus.blocksize:
+                raise ValueError(f"blocksize {blocksize} doesn't match the block size of the bus ({bus.blocksize})")
+            if num_output_channels != bus.num_channels:
+                raise ValueError(f"num_output_channels {num_output_channels} doesn't match the channel count of the bus ({bus.num_channels})")
+            if bus_slot is not None and not 0 <= bus_slot < bus.num_workers:
+                raise ValueError(f"bus_slot {bus_slot} is out of range, the bus has {bus.num_workers} worker slots")
         
         # Store configuration
         self.blocksize = blocksize
+        self.control_block_size = blocksize if control_block_size is None else control_block_size
         self.num_input_channels = num_input_channels
         self.num_output_channels = num_output_channels
         self.in_device = in_device
         self.out_device = out_device
         self.graph_name = graph_name
         self.package_name = package_name
+        self.message_ring_size = message_ring_size
+        self.duplex = duplex
+        self.cpu_affinity = cpu_affinity
+        self.realtime_priority = realtime_priority
+        self.nice = nice
+        self.isolate_audio_cores = isolate_audio_cores
+        self.bus = bus
+        self.bus_slot = bus_slot
+        self.track_mouse = graph_uses_mouse(graph_name, package_name) if track_mouse is None else track_mouse
+        self.mouse_slot: Optional[SharedArray] = None
+        self.backend = backend
         
         # Process control
         self.process: Optional[Process] = None
@@ -117,8 +163,14 @@ class MMMAudio:
         self.audio_running = Value(ctypes.c_bool, False)
         self.process_ready = Event()
         
-        # Command queue for sending messages to the audio process
+        # Command queue for sending commands to the audio process
         self.command_queue = Queue()
+
+        # Lock-free ring for parameter messages, created with the audio process
+        self.msg_ring: Optional[MessageRing] = None
+
+        # Engine telemetry written by the audio process, created with the audio process
+        self.stats: Optional[EngineStats] = None
         
         # Response queue for getting data back from audio process
         self.response_queue = Queue()
@@ -128,8 +180,13 @@ class MMMAudio:
         self.shared_float_params = {}
         self.shared_int_params = {}
         
-        # Sample rate will be set when process initializes
+        # Sample rate and output channel count will be set when process initializes
         self.sample_rate = Value(ctypes.c_int, 0)
+        self.output_channels = Value(ctypes.c_int, 0)
+
+        # Shared-memory buffer that get_samples renders into, grown on demand
+        self.samples_buffer: Optional[SharedArray] = None
+        self._retired_samples_buffers: List[SharedArray] = []
 
         MMMAudio.instances.append(self)
 
@@ -138,14 +195,43 @@ class MMMAudio:
         self.start_process(audio_init_timeout)
 
     @classmethod
-    def compile(cls, graph_name: str, package_name: str):
-        """Compile the Mojo graph and create the bridge module. This is automatically called when the audio process starts, but can be called manually if you want to compile without starting the audio process."""
+    def compile(cls, graph_name: str, package_name: str, use_cache: bool = True):
+        """Compile the Mojo graph and create the bridge module. This is automatically called when the audio process starts, but can be called manually if you want to compile without starting the audio process.
+
+        Compiled bridges are cached on disk (see `bridge_cache.py`), keyed by a hash of the bridge, the `mmm_audio` sources, the graph's package and the Mojo compiler version, so starting a graph that hasn't changed skips compilation entirely.
+
+        Args:
+            graph_name: Name of the Mojo graph to compile.
+            package_name: Name of the package containing the Mojo graph.
+            use_cache: If False, always compile with the Mojo importer and don't touch the cache.
+        """
         import os
+        import time
         try:
+            # loads the Mojo runtime and registers the importer for .mojo files
+            import mojo.importer
             from mmm_python.make_solo_graph import make_solo_graph
             import importlib
+
+            start = time.perf_counter()
+            if use_cache:
+                from mmm_python.bridge_cache import compile_bridge, load_cached_bridge
+                from mmm_python.make_solo_graph import solo_graph_source
+
+                MMMAudioBridge = load_cached_bridge(graph_name, package_name, solo_graph_source(graph_name, package_name))
+                if MMMAudioBridge is not None:
+                    print(f"Loaded cached Mojo graph '{graph_name}' from package '{package_name}'. It is ready to run.")
+                    return MMMAudioBridge
+
+                MMMAudioBridge = compile_bridge(graph_name, package_name)
+                if MMMAudioBridge is not None:
+                    print(f"Compiled Mojo graph '{graph_name}' from package '{package_name}' in {time.perf_counter() - start:.1f} s. It is ready to run.")
+                    return MMMAudioBridge
             
+            # no Mojo compiler on the path (or caching is off): fall back to the Mojo importer
             make_solo_graph(graph_name, package_name)
+            # after an edit, a hot swap needs the recompiled module, not the one already imported
+            sys.modules.pop(f"{graph_name}Bridge", None)
             MMMAudioBridge = importlib.import_module(f"{graph_name}Bridge")
             
             # MMMAudioBridge = importlib.import_module("GrainsBridge").MMMAudioBridge
@@ -154,13 +240,70 @@ class MMMAudio:
             bridge_file = graph_name + "Bridge" + ".mojo"
             if os.path.exists(bridge_file):
                 os.remove(bridge_file)
-            print(f"Compiled Mojo graph '{graph_name}' from package '{package_name}'. It is ready to run.")
+            print(f"Compiled Mojo graph '{graph_name}' from package '{package_name}' in {time.perf_counter() - start:.1f} s. It is ready to run.")
             return MMMAudioBridge
         except Exception as e:
             print(f"Error compiling Mojo bridge: {e}")
             sys.stdout.flush()
             return None
 
+    @classmethod
+    def precompile(cls, graphs: List[str | Tuple[str, str]], package_name: str = "examples", max_workers: Optional[int] = None) -> dict:
+        """Compile several graphs at the same time on a process pool.
+
+        Each compiled bridge lands in the bridge cache, so the `MMMAudio` instances created afterwards start without compiling. A rig with several graphs is then ready in the time of its slowest compile instead of the sum of all of them.
+
+        Args:
+            graphs: Graph names, or (graph_name, package_name) tuples. Repeated graphs are only compiled once.
+            package_name: Package used for graphs given by name only.
+            max_workers: Number of compiler processes. Defaults to one per graph, capped at the number of CPUs.
+
+        Returns:
+            A dictionary mapping each (graph_name, package_name) to its compile time in seconds, or None if it failed to compile.
+
+        Example:
+            ```python
+            MMMAudio.precompile(["ManyOscillators", "MoogPops", "NessStretch"])
+            mmm_audio = MMMAudio(128, graph_name="ManyOscillators")
+            ```
+        """
+        import os
+        import time
+        from concurrent.futures import ProcessPoolExecutor
+
+        jobs = []
+        for graph in graphs:
+            job = (graph, package_name) if isinstance(graph, str) else tuple(graph)
+            if job not in jobs:
+                jobs.append(job)
+        if not jobs:
+            return {}
+
+        if max_workers is None:
+            max_workers = min(len(jobs), os.cpu_count() or 1)
+
+        print(f"[Main] Compiling {len(jobs)} graph(s) on {max_workers} process(es)...")
+        sys.stdout.flush()
+
+        start = time.perf_counter()
+        times = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {job: pool.submit(_precompile_graph, *job) for job in jobs}
+            for job, future in futures.items():
+                try:
+                    times[job] = future.result()
+                except Exception as e:
+                    print(f"[Main] Error compiling '{job[0]}': {e}")
+                    times[job] = None
+
+        for (graph_name, package), seconds in times.items():
+            result = "failed" if seconds is None else f"{seconds:.1f} s"
+            print(f"[Main]   {package}.{graph_name}: {result}")
+        print(f"[Main] Precompile finished in {time.perf_counter() - start:.1f} s")
+        sys.stdout.flush()
+
+        return times
+
     @classmethod
     def exit_all(cls):
         """Handle Ctrl+C signal"""
@@ -183,6 +326,11 @@ class MMMAudio:
         
         self.stop_flag.clear()
         self.process_ready.clear()
+
+        self.msg_ring = MessageRing(self.message_ring_size)
+        self.stats = EngineStats()
+        if self.track_mouse:
+            self.mouse_slot = MouseTracker.register()
         
         self.process = Process(
             target=self._audio_process_main,
@@ -199,7 +347,20 @@ class MMMAudio:
                 self.process_ready,
                 self.command_queue,
                 self.response_queue,
-                self.sample_rate
+                self.sample_rate,
+                self.output_channels,
+                self.msg_ring.shared,
+                self.stats.shared,
+                self.duplex,
+                self.cpu_affinity,
+                self.realtime_priority,
+                self.nice,
+                self.isolate_audio_cores,
+                self.bus,
+                self.bus_slot,
+                self.mouse_slot,
+                self.backend,
+                self.control_block_size
             )
         )
         self.process.start()
@@ -227,6 +388,13 @@ class MMMAudio:
             print("[Main] Force terminating audio process")
             self.process.terminate()
             self.process.join(timeout=1.0)
+
+        self.msg_ring.close()
+        self.stats.close()
+        if self.mouse_slot is not None:
+            MouseTracker.unregister(self.mouse_slot)
+            self.mouse_slot = None
+        self._release_samples_buffers()
         
         print("[Main] Audio process stopped")
         self.process = None
@@ -251,58 +419,299 @@ class MMMAudio:
     # Message sending methods (same interface as original)
     # =========================================================================
     
-    def send_bool(self, key: str, value: bool):
+    # Messages go through the shared-memory message ring and are picked up
+    # by the audio engine at the top of the next block. With `at`, a message is
+    # delivered at that sample of the engine's clock instead (see get_sample_clock).
+    # `key` is a message name or the handle param_handle returned for it.
+
+    def send_bool(self, key: str | int, value: bool, at: Optional[int] = None):
         """Send a bool message to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_BOOL, (key, value)))
+        self.msg_ring.send(MsgType.BOOL, key, value, at)
+    
+    def send_bools(self, key: str | int, values: List[bool], at: Optional[int] = None):
+        """Send a list of bools to the Mojo audio engine."""
+        self.msg_ring.send(MsgType.BOOLS, key, values, at)
     
-    def send_float(self, key: str, value: float):
-        """Send a float to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_FLOAT, (key, value)))
+    def send_float(self, key: str | int, value: float, at: Optional[int] = None, ramp_time: float = 0.0, curve: str = "lin"):
+        """Send a float to the Mojo audio engine.
+
+        Args:
+            key: The message key or its key handle.
+            value: The value to send.
+            at: Sample clock time to deliver the message at, or None for the next block.
+            ramp_time: If greater than 0, the engine glides from the current value to `value` over this many seconds instead of jumping to it. A later float sent to the same key ends the ramp.
+            curve: Curve of the ramp, "lin" or "exp".
+        """
+        if ramp_time > 0.0:
+            self.msg_ring.send(MsgType.FLOAT_RAMP, key, ramp_values(value, ramp_time * self.sample_rate.value, curve), at)
+        else:
+            self.msg_ring.send(MsgType.FLOAT, key, value, at)
     
-    def send_floats(self, key: str, values: List[float]):
+    def send_floats(self, key: str | int, values: List[float], at: Optional[int] = None):
         """Send a list of floats to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_FLOATS, (key, values)))
+        self.msg_ring.send(MsgType.FLOATS, key, values, at)
     
-    def send_int(self, key: str, value: int):
+    def send_int(self, key: str | int, value: int, at: Optional[int] = None):
         """Send an integer to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_INT, (key, value)))
+        self.msg_ring.send(MsgType.INT, key, value, at)
     
-    def send_ints(self, key: str, values: List[int]):
+    def send_ints(self, key: str | int, values: List[int], at: Optional[int] = None):
         """Send a list of integers to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_INTS, (key, values)))
+        self.msg_ring.send(MsgType.INTS, key, values, at)
     
-    def send_trig(self, key: str):
+    def send_trig(self, key: str | int, at: Optional[int] = None):
         """Send a trigger message to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_TRIG, (key,)))
+        self.msg_ring.send(MsgType.TRIG, key, at=at)
     
-    def send_string(self, key: str, value: str):
+    def send_string(self, key: str | int, value: str, at: Optional[int] = None):
         """Send a string message to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_STRING, (key, value)))
+        self.msg_ring.send(MsgType.STRING, key, value, at)
     
-    def send_strings(self, key: str, args: List[str]):
+    def send_strings(self, key: str | int, args: List[str], at: Optional[int] = None):
         """Send a list of string messages to the Mojo audio engine."""
-        self.command_queue.put((AudioCommand.SEND_STRINGS, (key, args)))
+        self.msg_ring.send(MsgType.STRINGS, key, args, at)
+    
+    def send_msgs(self, records: bytes) -> bool:
+        """Send a batch of messages that reach the graph together, in the same block.
+
+        Args:
+            records: Message records joined together, as built with `encode_msg`. Records built with `at` keep their timestamps.
+
+        Returns:
+            True if the batch was written, False if the message ring was full and it was dropped.
+
+        Example:
+            ```python
+            from mmm_python.MessageRing import MsgType, encode_msg
+
+            mmm_audio.send_msgs(b"".join(encode_msg(MsgType.FLOAT, f"freq{i}", 100.0 * (i + 1)) for i in range(200)))
+            ```
+        """
+        return self.msg_ring.write(records)
     
     # =========================================================================
     # Methods that need response from audio process
     # =========================================================================
     
+    def _release_samples_buffers(self):
+        """Unlink the shared memory used by `get_samples`."""
+        if self.samples_buffer is not None:
+            self._retired_samples_buffers.append(self.samples_buffer)
+            self.samples_buffer = None
+        for buffer in self._retired_samples_buffers:
+            buffer.close()
+        self._retired_samples_buffers = []
+
+    def get_stats(self) -> dict:
+        """Get realtime statistics of the audio engine.
+
+        The numbers are read straight from shared memory written by the audio process, so this never waits on the audio process.
+
+        Returns:
+            A dictionary with the number of `blocks` rendered, the mean and peak `dsp_load` in percent of the block deadline, the `p50_ms`, `p99_ms` and `max_ms` block times, the `deadline_ms` of one block, the `xruns` (output underflows), `input_overflows` and `dropped_input` counts, and the mean and max callback `jitter_ms`.
+        """
+        if self.stats is None:
+            return {}
+        return self.stats.snapshot()
+
+    def get_sample_clock(self) -> int:
+        """Get the engine's sample clock: the number of samples it has rendered, extrapolated to now.
+
+        Pass a time ahead of the clock as the `at` argument of a `send_*` method, and the engine delivers the message at exactly that sample instead of at the top of the next block. Messages whose time has already passed are delivered at the top of the next block. Like `get_stats`, this reads shared memory and never waits on the audio process.
+
+        Example:
+            ```python
+            now = mmm_audio.get_sample_clock()
+            latency = 2048  # samples, comfortably more than one block
+            for i in range(4):
+                mmm_audio.send_trig("t_trig", at=now + latency + i * 6000)
+            ```
+        """
+        if self.stats is None:
+            return 0
+        return self.stats.sample_clock(self.sample_rate.value)
+
+    def param_handle(self, key: str, timeout: Optional[float] = 5.0) -> Optional[int]:
+        """Get the integer handle the engine uses for a message key (blocking call).
+
+        Every key is interned into a handle in the engine, and the `send_*` methods accept the handle in place of the key, which saves sending and looking up the name with every message. Handles stay valid across `swap_graph`, but not across restarting the audio process.
+
+        Args:
+            key: The message key, including any namespace.
+            timeout: Seconds to wait for the audio process.
+
+        Returns:
+            The handle, or None if the audio process didn't answer.
+
+        Example:
+            ```python
+            freq = mmm_audio.param_handle("freq")
+            for f in range(200, 800):
+                mmm_audio.send_float(freq, f)
+            ```
+        """
+        if not self.is_process_alive():
+            print("[Main] Audio process is not running")
+            return None
+        self.command_queue.put((AudioCommand.GET_PARAM_HANDLE, key))
+        try:
+            response = self.response_queue.get(timeout=timeout)
+        except Exception as e:
+            print(f"[Main] Error getting handle for '{key}': {e}")
+            return None
+        if response[0] != "HANDLE":
+            print(f"[Main] Unexpected response: {response[0]}")
+            return None
+        return response[1]
+
+    def upload_buffer(self, name: str, array: np.ndarray, sample_rate: Optional[float] = None, simd: bool = False, timeout: Optional[float] = 5.0) -> bool:
+        """Upload sample data from a numpy array into a Buffer or SIMDBuffer of the running graph (blocking call).
+
+        The array is copied once into shared memory, and the audio process copies it into a new buffer with one memcpy per channel (one for a SIMDBuffer), outside the audio callback. The graph swaps the new buffer in at the top of a block with `Messenger.update(buffer, name)`, so the audio thread never allocates or copies sample data. The buffer it replaces is freed by the next upload.
+
+        Args:
+            name: The message key of the buffer, including any namespace.
+            array: The samples, as a 1-D array for one channel or a 2-D array of shape (frames, channels).
+            sample_rate: Sample rate of the data. Defaults to the sample rate of the engine.
+            simd: Upload into a `SIMDBuffer` instead of a `Buffer`. SIMDBuffers can have 1, 2, 4 or 8 channels.
+            timeout: Seconds to wait for the audio process.
+
+        Returns:
+            True if the buffer was handed to the engine.
+
+        Example:
+            ```python
+            table = np.sin(np.linspace(0, 2 * np.pi, 2048, endpoint=False))
+            mmm_audio.upload_buffer("wavetable", table)
+            ```
+        """
+        if not self.is_process_alive():
+            print("[Main] Audio process is not running")
+            return False
+        data = np.asarray(array, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        if data.ndim != 2:
+            raise ValueError("upload_buffer takes a 1-D array or a 2-D array of shape (frames, channels)")
+        if not simd:
+            # a Buffer holds one list per channel
+            data = data.T
+        shared = SharedArray(data.shape, dtype=np.float64)
+        shared.array[...] = data
+        rate = float(sample_rate) if sample_rate is not None else float(self.sample_rate.value)
+        try:
+            self.command_queue.put((AudioCommand.UPLOAD_BUFFER, (name, shared, rate, simd)))
+            try:
+                response = self.response_queue.get(timeout=timeout)
+            except Exception as e:
+                print(f"[Main] Error uploading buffer '{name}': {e}")
+                return False
+        finally:
+            shared.close()
+        if response[0] != "UPLOADED":
+            print(f"[Main] Unexpected response: {response[0]}")
+            return False
+        return response[1]
+
+    def reset_stats(self):
+        """Clear the statistics returned by `get_stats`. Takes effect at the next audio block."""
+        if self.stats is not None:
+            self.stats.reset()
+
     def get_samples(self, samples: int) -> np.ndarray:
-        """Get samples from the audio process (blocking call)."""
-        self.command_queue.put((AudioCommand.GET_SAMPLES, samples))
+        """Get samples from the audio process (blocking call).
+
+        The audio process renders directly into a shared-memory buffer, so nothing is pickled on the way back. The returned array is a view of that buffer and is overwritten by the next call to `get_samples`. Use `.copy()` if you need to keep it.
+
+        Args:
+            samples: Number of sample frames to render.
+
+        Returns:
+            A float64 array of shape (samples, output channels).
+        """
+        num_channels = self.output_channels.value
+        buffer = self.samples_buffer
+        if buffer is None or buffer.shape[0] < samples or buffer.shape[1] != num_channels:
+            if buffer is not None:
+                # Views returned by earlier calls may still be alive, so the old
+                # segment is only closed when the process is stopped
+                self._retired_samples_buffers.append(buffer)
+            buffer = SharedArray((max(samples, self.blocksize), num_channels), dtype=np.float64)
+            self.samples_buffer = buffer
+
+        self.command_queue.put((AudioCommand.GET_SAMPLES, (buffer, samples)))
         
         # Wait for response
         try:
             response = self.response_queue.get(timeout=30.0)
             if response[0] == "SAMPLES":
-                return response[1]
+                return buffer.array[:samples]
             else:
                 print(f"[Main] Unexpected response: {response[0]}")
-                return np.zeros((samples, self.num_output_channels))
+                return np.zeros((samples, num_channels))
         except Exception as e:
             print(f"[Main] Error getting samples: {e}")
-            return np.zeros((samples, self.num_output_channels))
+            return np.zeros((samples, num_channels))
     
+    def swap_graph(self, graph_name: str, package_name: Optional[str] = None, crossfade_blocks: int = 32, timeout: Optional[float] = None) -> bool:
+        """Replace the running graph without restarting the audio process (blocking call).
+
+        The audio process compiles the new graph (or loads it from the bridge cache) while the old graph keeps playing. The new graph shares the oscillator and window tables and the message state of the old one, and both render every block while the output crossfades from the old graph to the new one. Messages sent during the crossfade reach both graphs.
+
+        The mouse slot is not changed, so a new graph that reads the mouse only gets its position if the old instance was already tracking it.
+
+        Args:
+            graph_name: Name of the new Mojo graph.
+            package_name: Package containing the new graph. Defaults to the current package.
+            crossfade_blocks: Length of the equal-power crossfade in blocks.
+            timeout: Seconds to wait for the compile and the crossfade. None waits as long as it takes.
+
+        Returns:
+            True if the new graph is playing, False if it failed to compile or the swap timed out.
+
+        Example:
+            ```python
+            mmm_audio = MMMAudio(128, graph_name="ManyOscillators")
+            mmm_audio.start_audio()
+            # edit ManyOscillators.mojo, then
+            mmm_audio.swap_graph("ManyOscillators", crossfade_blocks=64)
+            ```
+        """
+        package_name = self.package_name if package_name is None else package_name
+        self.command_queue.put((AudioCommand.SWAP_GRAPH, (graph_name, package_name, max(1, crossfade_blocks))))
+
+        try:
+            response = self.response_queue.get(timeout=timeout)
+        except Exception as e:
+            print(f"[Main] Error swapping graph: {e}")
+            return False
+        if response[0] != "SWAPPED":
+            print(f"[Main] Unexpected response: {response[0]}")
+            return False
+        if response[1]:
+            self.graph_name = graph_name
+            self.package_name = package_name
+        return response[1]
+
+    def set_block_size(self, control_block_size: int):
+        """Change the control block size of the running engine.
+
+        The device keeps calling the engine with buffers of `blocksize` frames, which the engine renders as a series of control blocks of `control_block_size` frames (the last one shorter if `blocksize` isn't a multiple of it). Messages reach the graph at the top of every control block, and `world[].block_size` and `world[].top_of_block` follow the control block. Changing the device block size itself still needs a new MMMAudio instance.
+
+        Args:
+            control_block_size: Frames per control block.
+
+        Example:
+            ```python
+            mmm_audio = MMMAudio(1024, graph_name="ManyOscillators")
+            mmm_audio.start_audio()
+            # finer control timing without a smaller device buffer
+            mmm_audio.set_block_size(64)
+            ```
+        """
+        self.control_block_size = max(1, int(control_block_size))
+        self.command_queue.put((AudioCommand.SET_BLOCK_SIZE, self.control_block_size))
+
     def plot(self, samples: int, clear: bool = True):
         """Plot samples from the audio process."""
         import matplotlib.pyplot as plt
@@ -354,7 +763,20 @@ class MMMAudio:
         process_ready: Event,
         command_queue: Queue,
         response_queue: Queue,
-        sample_rate_value: Value
+        sample_rate_value: Value,
+        output_channels_value: Value,
+        msg_ring_shared: SharedArray,
+        stats_shared: SharedArray,
+        duplex: bool,
+        cpu_affinity: Optional[List[int]],
+        realtime_priority: Optional[int],
+        nice: Optional[int],
+        isolate_audio_cores: bool,
+        bus: Optional[SummingBus],
+        bus_slot: Optional[int],
+        mouse_slot: Optional[SharedArray],
+        backend: str | AudioBackend,
+        control_block_size: int
     ):
         """
         Main function for the audio process.
@@ -362,29 +784,32 @@ class MMMAudio:
         import sys
         import os
         import numpy as np
-        import pyaudio
-        import asyncio
         import threading
+        import time
         from math import ceil
-        import pyautogui
-        import queue
         
+        from mmm_python import realtime
+        from mmm_python.AudioBackends import PA_CONTINUE, make_backend
+
+        # message handling modes of the bridge, see MsgScheduler in mmm_audio/MessageRing_Module.mojo
+        MSG_MODE_SOLO = 0
+        MSG_MODE_LEAD = 1
+        MSG_MODE_FOLLOW = 2
+
         pid = os.getpid()
         print(f"[PID {pid}] Audio process starting...")
         sys.stdout.flush()
-        
-        def get_device_info(p_temp, device_name, is_input=True):
-            if device_name != "default":
-                for i in range(p_temp.get_device_count()):
-                    dev_info = p_temp.get_device_info_by_index(i)
-                    if device_name in dev_info['name']:
-                        return dev_info
-                print(f"[PID {pid}] Device '{device_name}' not found, using default")
-            
-            if is_input:
-                return p_temp.get_default_input_device_info()
+
+        # Keep this thread (the command loop) and every thread it starts off the
+        # audio cores. The callback threads move themselves onto them below.
+        if cpu_affinity is not None and isolate_audio_cores:
+            control_cpus = realtime.available_cpus() - set(cpu_affinity)
+            if control_cpus:
+                realtime.set_thread_affinity(control_cpus)
+                print(f"[PID {pid}] Control threads on cores {sorted(control_cpus)}, audio on {sorted(cpu_affinity)}")
             else:
-                return p_temp.get_default_output_device_info()
+                print(f"[PID {pid}] No cores left for the control threads, not isolating the audio cores")
+            sys.stdout.flush()
         
         # =========================================================================
         # Initialize Mojo bridge
@@ -393,69 +818,62 @@ class MMMAudio:
         MMMAudioBridge = MMMAudio.compile(graph_name, package_name)
         
         # =========================================================================
-        # Initialize PyAudio and get device info
+        # Open the audio backend and get the device configuration
         # =========================================================================
-        
-        if in_device is None:
-            in_device = "default"
-            in_device_exists = False
-        else:
-            in_device_exists = True
-        if out_device is None:
-            out_device = "default"
-            out_device_exists = False
-        else:
-            out_device_exists = True
-        p_temp = pyaudio.PyAudio()
-        if in_device_exists:
-            in_device_info = get_device_info(p_temp, in_device, True)
-        if out_device_exists:
-            out_device_info = get_device_info(p_temp, out_device, False)
-        p_temp.terminate()
-        
-        if in_device_exists and out_device_exists:
-            if in_device_info['defaultSampleRate'] != out_device_info['defaultSampleRate']:
-                print(f"[PID {pid}] Sample rate mismatch!")
+
+        bus_worker = bus is not None and bus_slot is not None
+        if bus_worker:
+            # bus workers render into shared memory and never touch a device
+            in_device = None
+            out_device = None
+
+        audio_backend = make_backend(backend)
+        config = audio_backend.configure(in_device, out_device, num_input_channels, num_output_channels, duplex)
+        if config is None:
+            return
+
+        sample_rate = config.sample_rate
+        if bus_worker:
+            sample_rate = bus.wait_for_sample_rate()
+            if sample_rate == 0:
+                print(f"[PID {pid}] The bus master has not started, can't run as a bus worker")
                 sys.stdout.flush()
                 return
-
-        if in_device_exists:
-            sample_rate = int(in_device_info['defaultSampleRate'])
-        elif out_device_exists:
-            sample_rate = int(out_device_info['defaultSampleRate'])
-        else:
-            sample_rate = 48000
         sample_rate_value.value = sample_rate
         
-        if in_device_exists:
-            in_device_index = in_device_info['index']
-            actual_input_channels = min(num_input_channels, int(in_device_info['maxInputChannels']))
-        else:
-            actual_input_channels = 0
-        if out_device_exists:
-            out_device_index = out_device_info['index']
-            actual_output_channels = min(num_output_channels, int(out_device_info['maxOutputChannels']))
-        else:
-            actual_output_channels = 0
+        actual_input_channels = config.num_input_channels
+        actual_output_channels = config.num_output_channels
+        use_duplex = config.duplex
+        if bus_worker:
+            actual_output_channels = bus.num_channels
+        elif bus is not None:
+            bus.set_sample_rate(sample_rate)
+        output_channels_value.value = actual_output_channels
         
-        print(f"[PID {pid}] Sample rate: {sample_rate}, Block size: {blocksize}")
+        print(f"[PID {pid}] Sample rate: {sample_rate}, Block size: {blocksize}, Control block size: {control_block_size}")
         print(f"[PID {pid}] Input channels: {actual_input_channels}, Output channels: {actual_output_channels}")
         sys.stdout.flush()
         
         # =========================================================================
         # Initialize Mojo audio bridge
         # =========================================================================
-        mmm_audio_bridge = MMMAudioBridge.MMMAudioBridge(sample_rate, blocksize)
+        mmm_audio_bridge = MMMAudioBridge.MMMAudioBridge(sample_rate, control_block_size)
         mmm_audio_bridge.set_channel_count((actual_input_channels, actual_output_channels))
+        mmm_audio_bridge.set_msg_ring(msg_ring_shared.array)
+
+        stats = EngineStats(stats_shared)
+        stats.set_deadline(blocksize, sample_rate)
+        mmm_audio_bridge.set_clock_slot(stats.clock_slot)
         
-        screen_dims = pyautogui.size()
-        mmm_audio_bridge.set_screen_dims(screen_dims)
+        if mouse_slot is not None:
+            # the main process writes the mouse position into the slot, and the
+            # engine picks it up at the top of each block
+            mmm_audio_bridge.set_mouse_slot(mouse_slot.array)
         
         # =========================================================================
         # Shared state for callback
         # =========================================================================
         audio_active = threading.Event()
-        input_queue = queue.Queue(maxsize=32)
         
         # Lock for thread-safe bridge access
         bridge_lock = threading.Lock()
@@ -463,110 +881,220 @@ class MMMAudio:
         # =========================================================================
         # Audio callbacks
         # =========================================================================
+        # Buffers reused by every output callback, so the callback does not
+        # allocate. They are bound to the bridge once, so rendering a block is
+        # a call without arguments. The bridge reads in_f32 and writes clipped
+        # float32 samples straight into out_f32, and the backend reads them
+        # through a read-only memoryview. They hold one device block, and only
+        # grow if the host asks for a larger buffer.
+        buffer_frames = blocksize
+        out_f32 = np.zeros((blocksize, actual_output_channels), dtype=np.float32)
+        out_view = memoryview(out_f32).cast('B').toreadonly()
+        in_f32 = np.zeros(blocksize * actual_input_channels, dtype=np.float32)
+        silence_out = bytes(out_f32.nbytes)
+        mmm_audio_bridge.bind_buffers(in_f32, out_f32)
+
+        input_resets = [0]
+
+        # While a hot-swapped graph fades in, swap_bridge renders alongside the
+        # running bridge and its output is crossfaded into the output.
+        # swap_pos counts the frames of the fade played so far.
+        swap_bridge = None
+        swap_pos = 0
+        swap_out = np.zeros_like(out_f32)  # bound to swap_bridge
+        fade_in = None
+        fade_out = None
+        retired_bridges = []
+
+        # The bus carries whole device blocks. A host buffer of another size
+        # plays the workers' audio from bus_block, which holds the current bus
+        # block, and bus_pos counts the frames of it already played.
+        bus_block = np.zeros((blocksize, actual_output_channels), dtype=np.float32)
+        bus_pos = 0
+
+        def grow_buffers(frames):
+            """Rebind larger buffers when the host asks for more than a device block. Called with bridge_lock held."""
+            nonlocal buffer_frames, out_f32, out_view, in_f32, swap_out
+            buffer_frames = frames
+            out_f32 = np.zeros((frames, actual_output_channels), dtype=np.float32)
+            out_view = memoryview(out_f32).cast('B').toreadonly()
+            in_f32 = np.zeros(frames * actual_input_channels, dtype=np.float32)
+            swap_out = np.zeros_like(out_f32)
+            mmm_audio_bridge.bind_buffers(in_f32, out_f32)
+            if swap_bridge is not None:
+                swap_bridge.bind_buffers(in_f32, swap_out)
+
+        def finish_swap():
+            """Make the incoming bridge the only one. Called with bridge_lock held."""
+            nonlocal mmm_audio_bridge, swap_bridge
+            swap_bridge.set_msg_mode(MSG_MODE_SOLO)
+            # the old bridge is released by the command loop, not in the callback
+            retired_bridges.append(mmm_audio_bridge)
+            mmm_audio_bridge = swap_bridge
+            swap_bridge = None
+            # push_input now reports the new bridge's count
+            input_resets[0] = 0
+
+        def render(frames):
+            """Render `frames` frames from in_f32 into out_f32. Called with bridge_lock held."""
+            nonlocal swap_pos
+            if swap_bridge is None:
+                if frames == buffer_frames:
+                    mmm_audio_bridge.next_bound()
+                else:
+                    # a host buffer smaller than the bound buffers
+                    mmm_audio_bridge.next_span(0, frames)
+                return
+            # The bridges take turns: the lead renders one control block (or up
+            # to the next timestamped message) and the follow renders the same
+            # frames, so both graphs see every message on the same sample.
+            offset = 0
+            while offset < frames:
+                n = mmm_audio_bridge.next_span(offset, frames - offset)
+                swap_bridge.next_span(offset, n)
+                offset += n
+            faded = min(frames, len(fade_in) - swap_pos)
+            out_f32[:faded] *= fade_out[swap_pos:swap_pos + faded]
+            swap_out[:faded] *= fade_in[swap_pos:swap_pos + faded]
+            # past the end of the fade only the incoming graph plays
+            out_f32[faded:frames] = 0.0
+            out_f32[:frames] += swap_out[:frames]
+            swap_pos += faded
+            if swap_pos == len(fade_in):
+                finish_swap()
+
+        def mix_bus(frames):
+            """Add the workers' audio for `frames` frames to out_f32 and clip the sum. Called with bridge_lock held."""
+            nonlocal bus_pos
+            if frames == blocksize and bus_pos == 0:
+                bus.mix_into(out_f32[:blocksize])
+            else:
+                done = 0
+                while done < frames:
+                    if bus_pos == 0:
+                        bus_block.fill(0.0)
+                        bus.mix_into(bus_block)
+                    n = min(frames - done, blocksize - bus_pos)
+                    out_f32[done:done + n] += bus_block[bus_pos:bus_pos + n]
+                    bus_pos = (bus_pos + n) % blocksize
+                    done += n
+            np.clip(out_f32[:frames], -1.0, 1.0, out=out_f32[:frames])
+
+        # PortAudio creates its callback threads, so they are configured from
+        # inside their first callback
+        configured_threads = set()
+        configure_threads = cpu_affinity is not None or realtime_priority is not None or nice is not None
+
+        def configure_callback_thread():
+            thread_id = threading.get_ident()
+            if thread_id not in configured_threads:
+                configured_threads.add(thread_id)
+                realtime.configure_audio_thread(cpu_affinity, realtime_priority, nice)
+
         def input_callback(in_data, frame_count, time_info, status):
-            """Called by PyAudio when input data is available"""
+            """Called by the backend when input data is available on a separate input stream"""
+            if configure_threads:
+                configure_callback_thread()
+            stats.record_status(status)
             if audio_active.is_set():
-                try:
-                    input_queue.put_nowait(in_data)
-                except queue.Full:
-                    pass  # Drop frame if queue is full
-            return (None, pyaudio.paContinue)
-        
+                in_array = np.frombuffer(in_data, dtype=np.float32)
+                with bridge_lock:
+                    resets = mmm_audio_bridge.push_input(in_array)
+                    if swap_bridge is not None:
+                        swap_bridge.push_input(in_array)
+                if resets != input_resets[0]:
+                    stats.record_dropped_input(resets - input_resets[0])
+                    input_resets[0] = resets
+            return (None, PA_CONTINUE)
+
         def output_callback(in_data, frame_count, time_info, status):
-            """Called by PyAudio when output data is needed"""
+            """Called by the backend when output data is needed. In duplex mode in_data holds the matching input block."""
+            callback_time = time.perf_counter()
+            if configure_threads:
+                configure_callback_thread()
+            stats.record_status(status)
             if not audio_active.is_set():
                 # Return silence when not active
-                silence = np.zeros(
-                    frame_count * actual_output_channels,
-                    dtype=np.float32
-                )
-                return (silence.tobytes(), pyaudio.paContinue)
+                if frame_count != blocksize:
+                    return (bytes(frame_count * actual_output_channels * 4), PA_CONTINUE)
+                return (silence_out, PA_CONTINUE)
             
             try:
-                # Get input data from queue
-                try:
-                    input_bytes = input_queue.get_nowait()
-                    in_array = np.frombuffer(input_bytes, dtype=np.float32)
-                except queue.Empty:
-                    in_array = np.zeros(
-                        frame_count * actual_input_channels,
-                        dtype=np.float32
-                    )
-                
-                
-                out_buffer = np.zeros(
-                    (frame_count, actual_output_channels),
-                    dtype=np.float64
-                )
-                # Process through Mojo bridge
                 with bridge_lock:
-                    mmm_audio_bridge.next(in_array, out_buffer)
-                
-                out_buffer = np.clip(out_buffer, -1.0, 1.0)
-                output_bytes = out_buffer.astype(np.float32).tobytes()
+                    if frame_count > buffer_frames:
+                        grow_buffers(frame_count)
+                    # In duplex mode the input block arrives with the callback.
+                    # Otherwise the engine reads resampled input pushed by input_callback.
+                    if in_data is not None:
+                        in_f32[:frame_count * actual_input_channels] = np.frombuffer(in_data, dtype=np.float32)
+                    elif use_duplex:
+                        in_f32.fill(0.0)
+                        stats.record_dropped_input()
+
+                    # Process through Mojo bridge. A host buffer of any size
+                    # is rendered as a series of control blocks.
+                    block_start = time.perf_counter()
+                    render(frame_count)
+                    block_time = time.perf_counter() - block_start
+                    if bus is not None:
+                        # bus master: add the workers' blocks and clip the sum in place
+                        mix_bus(frame_count)
+                    output = out_view
+                    if frame_count != buffer_frames:
+                        output = out_view[:frame_count * actual_output_channels * 4]
+                stats.record_block(block_time, callback_time)
                 
-                return (output_bytes, pyaudio.paContinue)
+                return (output, PA_CONTINUE)
             
             except Exception as e:
                 print(f"[PID {pid}] Output callback error: {e}")
                 sys.stdout.flush()
-                silence = np.zeros(
-                    frame_count * actual_output_channels,
-                    dtype=np.float32
-                )
-                return (silence.tobytes(), pyaudio.paContinue)
+                return (bytes(frame_count * actual_output_channels * 4), PA_CONTINUE)
         
         # =========================================================================
-        # Mouse position tracking
+        # Start the backend with the callbacks
         # =========================================================================
-        async def get_mouse_position(delay: float = 0.01):
-            while not stop_flag.is_set():
-                try:
-                    x, y = pyautogui.position()
-                    x = x / pyautogui.size().width
-                    y = y / pyautogui.size().height
-                    with bridge_lock:
-                        mmm_audio_bridge.update_mouse_pos([x, y])
-                except:
-                    pass
-                await asyncio.sleep(delay)
-        
-        mouse_thread = threading.Thread(
-            target=asyncio.run,
-            args=(get_mouse_position(0.01),),
-            daemon=False
-        )
-        mouse_thread.start()
-        
+        if use_duplex:
+            print(f"[PID {pid}] Full-duplex stream")
+        elif config.resample_input:
+            # Separate streams run on separate clocks, so input is resampled
+            # to the output clock instead of dropping or repeating blocks
+            mmm_audio_bridge.set_input_resampling((True, blocksize))
+            print(f"[PID {pid}] Separate input and output streams, resampling input")
+
+        audio_backend.start(blocksize, output_callback, input_callback, audio_active)
+
         # =========================================================================
-        # Initialize PyAudio with callbacks
+        # Bus worker render loop
         # =========================================================================
-        p = pyaudio.PyAudio()
-        format_code = pyaudio.paFloat32
-        
-        if in_device_exists:
-            input_stream = p.open(
-                format=format_code,
-                channels=actual_input_channels,
-                rate=sample_rate,
-                input=True,
-                input_device_index=in_device_index,
-                frames_per_buffer=blocksize,
-                stream_callback=input_callback
-            )
-            input_stream.start_stream()
-
-        if out_device_exists:
-            output_stream = p.open(
-                format=format_code,
-                channels=actual_output_channels,
-                rate=sample_rate,
-                output=True,
-                output_device_index=out_device_index,
-                frames_per_buffer=blocksize,
-                stream_callback=output_callback
-            )
-            output_stream.start_stream()
+        def bus_worker_loop():
+            """Render blocks into this worker's slots of the summing bus, staying just ahead of the master"""
+            if configure_threads:
+                configure_callback_thread()
+            poll_interval = blocksize / sample_rate / 4
+            while not stop_flag.is_set():
+                if not audio_active.is_set():
+                    bus.set_active(bus_slot, False)
+                    time.sleep(0.01)
+                    continue
+                bus.set_active(bus_slot, True)
+                slot = bus.next_block(bus_slot)
+                if slot is None:
+                    time.sleep(poll_interval)
+                    continue
+                callback_time = time.perf_counter()
+                with bridge_lock:
+                    render(blocksize)
+                    block_time = time.perf_counter() - callback_time
+                    slot[:] = out_f32[:blocksize]
+                bus.publish(bus_slot)
+                stats.record_block(block_time, callback_time)
+            bus.set_active(bus_slot, False)
+
+        if bus_worker:
+            bus_thread = threading.Thread(target=bus_worker_loop, daemon=True)
+            bus_thread.start()
+            print(f"[PID {pid}] Rendering into slot {bus_slot} of the summing bus")
         
         print(f"[PID {pid}] Streams started")
         sys.stdout.flush()
@@ -596,110 +1124,127 @@ class MMMAudio:
         def handle_stop_audio(args):
             audio_active.clear()
             audio_running.value = False
-            # Clear the input queue
-            while not input_queue.empty():
-                try:
-                    input_queue.get_nowait()
-                except:
-                    break
             print(f"[PID {pid}] Audio deactivated")
             sys.stdout.flush()
             return True
 
-        def handle_send_bool(args):
-            key, value = args
-            with bridge_lock:
-                mmm_audio_bridge.update_bool_msg([key, value])
-            return True
+        def handle_get_samples(args):
+            samples_shared, samples = args
+            waveform = samples_shared.array
 
-        def handle_send_float(args):
-            key, value = args
-            with bridge_lock:
-                mmm_audio_bridge.update_float_msg([key, value])
-            return True
+            in_buf = np.zeros(
+                (samples, actual_input_channels),
+                dtype=np.float32
+            )
 
-        def handle_send_floats(args):
-            key, values = args
-            key_vals = [key]
-            key_vals.extend(values)
             with bridge_lock:
-                mmm_audio_bridge.update_floats_msg(key_vals)
-            return True
+                # The bridge splits any buffer into control blocks, and row
+                # slices of the C-ordered shared buffer are contiguous, so the
+                # samples are rendered straight into their place in one call
+                mmm_audio_bridge.next(in_buf, waveform[:samples])
 
-        def handle_send_int(args):
-            key, value = args
-            with bridge_lock:
-                mmm_audio_bridge.update_int_msg([key, value])
+            del waveform
+            samples_shared.close()
+            response_queue.put(("SAMPLES", samples))
             return True
 
-        def handle_send_ints(args):
-            key, values = args
-            key_vals = [key]
-            key_vals.extend([int(i) for i in values])
-            with bridge_lock:
-                mmm_audio_bridge.update_ints_msg(key_vals)
-            return True
+        def handle_swap_graph(args):
+            nonlocal swap_bridge, swap_pos, fade_in, fade_out
+            new_graph_name, new_package_name, crossfade_blocks = args
+
+            # compiling only holds up the command loop, the old graph keeps playing
+            NewBridge = MMMAudio.compile(new_graph_name, new_package_name)
+            if NewBridge is None:
+                response_queue.put(("SWAPPED", False))
+                return True
+
+            new_bridge = NewBridge.MMMAudioBridge(sample_rate, control_block_size, mmm_audio_bridge.shared_tables())
+            new_bridge.set_channel_count((actual_input_channels, actual_output_channels))
+            new_bridge.set_msg_ring(msg_ring_shared.array)
+            new_bridge.set_clock_slot(stats.clock_slot)
+            if mouse_slot is not None:
+                new_bridge.set_mouse_slot(mouse_slot.array)
+            if config.resample_input:
+                new_bridge.set_input_resampling((True, blocksize))
+
+            # equal-power crossfade, since the two graphs are not correlated
+            phase = np.arange(1, crossfade_blocks * blocksize + 1) / (crossfade_blocks * blocksize) * (np.pi / 2)
+            new_fade_in = np.sin(phase).astype(np.float32).reshape(-1, 1)
+            new_fade_out = np.cos(phase).astype(np.float32).reshape(-1, 1)
 
-        def handle_send_trig(args):
-            key = args[0]
             with bridge_lock:
-                mmm_audio_bridge.update_trig_msg([key])
-            return True
+                if swap_bridge is not None:
+                    finish_swap()
+                # bound under the lock, as the callback may have grown the buffers
+                new_bridge.bind_buffers(in_f32, swap_out)
+                new_bridge.set_sample_clock(mmm_audio_bridge.get_sample_clock())
+                mmm_audio_bridge.set_msg_mode(MSG_MODE_LEAD)
+                new_bridge.set_msg_mode(MSG_MODE_FOLLOW)
+                fade_in = new_fade_in
+                fade_out = new_fade_out
+                swap_pos = 0
+                swap_bridge = new_bridge
+            print(f"[PID {pid}] Crossfading to graph '{new_graph_name}' over {crossfade_blocks} blocks")
+            sys.stdout.flush()
 
-        def handle_send_string(args):
-            key, value = args
+            while swap_bridge is not None and audio_active.is_set() and not stop_flag.is_set():
+                time.sleep(0.01)
             with bridge_lock:
-                mmm_audio_bridge.update_string_msg([key, str(value)])
+                if swap_bridge is not None:
+                    # nothing is rendering, so switch right away
+                    finish_swap()
+                retired = retired_bridges[:]
+                retired_bridges.clear()
+            del retired
+
+            response_queue.put(("SWAPPED", True))
             return True
 
-        def handle_send_strings(args):
-            key, values = args
-            key_vals = [key]
-            key_vals.extend(values)
+        def handle_set_block_size(args):
+            nonlocal control_block_size
+            control_block_size = max(1, int(args))
             with bridge_lock:
-                mmm_audio_bridge.update_strings_msg(key_vals)
+                mmm_audio_bridge.set_block_size(control_block_size)
+                if swap_bridge is not None:
+                    swap_bridge.set_block_size(control_block_size)
+            print(f"[PID {pid}] Control block size: {control_block_size}")
+            sys.stdout.flush()
             return True
 
-        def handle_get_samples(args):
-            samples = args
-            blocks = ceil(samples / blocksize)
-            waveform = np.zeros(
-                samples * actual_output_channels,
-                dtype=np.float64
-            ).reshape(samples, actual_output_channels)
-
-            in_buf = np.zeros(
-                (blocksize, actual_input_channels),
-                dtype=np.float64
-            )
-            temp_out = np.zeros(
-                (blocksize, actual_output_channels),
-                dtype=np.float64
-            )
-
+        def handle_get_param_handle(args):
+            # the audio thread interns keys too, so hold the lock
             with bridge_lock:
-                for i in range(blocks):
-                    mmm_audio_bridge.next(in_buf, temp_out)
-                    for j in range(temp_out.shape[0]):
-                        if i * blocksize + j < samples:
-                            waveform[i * blocksize + j] = temp_out[j]
+                handle = mmm_audio_bridge.get_param_handle(args)
+            response_queue.put(("HANDLE", int(handle)))
+            return True
 
-            response_queue.put(("SAMPLES", waveform))
+        def handle_upload_buffer(args):
+            # unpickling the SharedArray attached to the main process's segment
+            name, shared, sample_rate, simd = args
+            try:
+                with bridge_lock:
+                    uploaded = bool(mmm_audio_bridge.upload_buffer(name, shared.array, sample_rate, simd))
+                if not uploaded:
+                    print(f"[PID {pid}] Can't upload '{name}': a SIMDBuffer has 1, 2, 4 or 8 channels")
+                    sys.stdout.flush()
+            except Exception as e:
+                print(f"[PID {pid}] Error uploading buffer '{name}': {e}")
+                sys.stdout.flush()
+                uploaded = False
+            finally:
+                shared.close()
+            response_queue.put(("UPLOADED", uploaded))
             return True
 
         command_handlers = [
             handle_stop_process,
             handle_start_audio,
             handle_stop_audio,
-            handle_send_bool,
-            handle_send_float,
-            handle_send_floats,
-            handle_send_int,
-            handle_send_ints,
-            handle_send_trig,
-            handle_send_string,
-            handle_send_strings,
             handle_get_samples,
+            handle_swap_graph,
+            handle_set_block_size,
+            handle_get_param_handle,
+            handle_upload_buffer,
         ]
 
         while not stop_flag.is_set():
@@ -737,15 +1282,27 @@ class MMMAudio:
         
         audio_active.clear()
         
-        input_stream.stop_stream()
-        input_stream.close()
-        output_stream.stop_stream()
-        output_stream.close()
-        p.terminate()
+        audio_backend.stop()
+
+        msg_ring_shared.close()
+        stats.close()
+        if bus is not None:
+            bus.close()
+        if mouse_slot is not None:
+            mouse_slot.close()
         
         print(f"[PID {pid}] Audio process terminated")
         sys.stdout.flush()
 
+def _precompile_graph(graph_name: str, package_name: str) -> Optional[float]:
+    """Worker for `MMMAudio.precompile`. Runs in a pool process and returns the compile time, or None on failure."""
+    import time
+
+    start = time.perf_counter()
+    if MMMAudio.compile(graph_name, package_name) is None:
+        return None
+    return time.perf_counter() - start
+
 def list_audio_devices():
     print("Deprecated: Use MMMAudio.get_audio_devices()")
     # p_temp = pyaudio.PyAudio()
@@ -0,0 +1,261 @@
+"""
+Lock-free message ring for sending parameter messages from Python to the Mojo audio engine.
+
+Messages are written as typed binary records into a fixed-size ring buffer in shared memory. The audio engine drains the ring at the top of every audio block (see `MessageRing` in MessageRing_Module.mojo), so sending a message never pickles anything or takes a lock in the audio process.
+"""
+import ctypes
+import platform
+import struct
+import sys
+import threading
+from enum import IntEnum
+from typing import List, Optional, Union
+
+import numpy as np
+
+from mmm_python.SharedArray import SharedArray
+
+
+class MsgType(IntEnum):
+    """Record types understood by the Mojo side of the ring. Must match `MsgType` in MessageRing_Module.mojo."""
+    PAD = 0
+    BOOL = 1
+    BOOLS = 2
+    FLOAT = 3
+    FLOATS = 4
+    INT = 5
+    INTS = 6
+    TRIG = 7
+    TRIGS = 8
+    STRING = 9
+    STRINGS = 10
+    FLOAT_RAMP = 11
+
+
+# Curves of FLOAT_RAMP messages. Must match `RampCurve` in Messenger_Module.mojo.
+RAMP_CURVES = {"lin": 0, "exp": 1}
+
+
+# Ring layout (all integers little endian):
+#   [0:8]      write position (UInt64), only written by Python
+#   [64:72]    read position (UInt64), only written by Mojo
+#   [128:...]  record data, `capacity` bytes
+# The two positions sit on separate cache lines and count bytes since the ring
+# was created; the offset of a record is position % capacity.
+WRITE_POS_OFFSET = 0
+READ_POS_OFFSET = 64
+HEADER_SIZE = 128
+
+# Record layout:
+#   UInt32 size      total record size including header and padding
+#   UInt16 type      MsgType, with TIMED_FLAG set if the record has a timestamp
+#                    and HANDLE_FLAG set if the key is a key handle
+#   UInt16 key_len   length of the utf-8 key in bytes (4 for a handle)
+#   UInt32 count     number of values in the payload
+#   UInt32 time      low 32 bits of the sample clock the message is due at
+#   key bytes (or the UInt32 handle), padded to 8 bytes
+#   payload, padded so the whole record is a multiple of 16 bytes
+RECORD_HEADER = struct.Struct("<IHHII")
+RECORD_ALIGN = 16
+TIMED_FLAG = 0x8000
+HANDLE_FLAG = 0x4000
+
+
+def _make_store_barrier():
+    """Return a function that makes every store before it visible to other cores before any store after it.
+
+    The engine must not see a new write position before the bytes of the records it covers. x86 never reorders stores with other stores, but ARM (Apple silicon) does, so there a real barrier is needed.
+    """
+    if platform.machine().lower() in ("x86_64", "amd64", "i386", "i686"):
+        return lambda: None
+    if sys.platform == "darwin":
+        try:
+            return ctypes.CDLL("/usr/lib/libSystem.B.dylib").OSMemoryBarrier
+        except (OSError, AttributeError):
+            pass
+    # locking and unlocking a mutex is a full barrier in every pthreads implementation
+    barrier_lock = threading.Lock()
+
+    def barrier():
+        barrier_lock.acquire()
+        barrier_lock.release()
+    return barrier
+
+
+_store_barrier = _make_store_barrier()
+
+
+def _pad(n: int, align: int) -> int:
+    return (n + align - 1) & ~(align - 1)
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    """Each string is written as a UInt32 byte length followed by its utf-8 bytes, padded to 4 bytes."""
+    out = bytearray()
+    for v in values:
+        b = str(v).encode("utf-8")
+        out += struct.pack("<I", len(b))
+        out += b
+        out += bytes(_pad(len(b), 4) - len(b))
+    return bytes(out)
+
+
+def ramp_values(target: float, num_samples: float, curve: str = "lin") -> List[float]:
+    """The values of a FLOAT_RAMP message: the target, the length of the ramp in samples and the curve code.
+
+    Args:
+        target: The value to ramp to.
+        num_samples: Length of the ramp in samples.
+        curve: "lin" for a linear ramp or "exp" for an exponential one. Exponential ramps between values of different sign, or from or to 0, are linear.
+    """
+    if curve not in RAMP_CURVES:
+        raise ValueError(f"Unknown ramp curve: {curve}, use one of {list(RAMP_CURVES)}")
+    return [float(target), float(round(num_samples)), float(RAMP_CURVES[curve])]
+
+
+def encode_msg(msg_type: MsgType, key: Union[str, int], values=None, at: Optional[int] = None) -> bytes:
+    """Encode one message as a binary record.
+
+    Args:
+        msg_type: The `MsgType` of the record.
+        key: The message key (including any namespace), or the integer key handle the engine assigned to it.
+        values: The value(s) of the message. Scalars for the single-value types, lists for the list types, None for triggers, and the list from `ramp_values` for FLOAT_RAMP.
+        at: Sample clock time the engine should deliver the message at, or None to deliver it at the top of the next block.
+
+    Returns:
+        The encoded record.
+    """
+    if msg_type == MsgType.BOOL:
+        count, payload = 1, struct.pack("<B", bool(values))
+    elif msg_type == MsgType.BOOLS or msg_type == MsgType.TRIGS:
+        count, payload = len(values), bytes(bool(v) for v in values)
+    elif msg_type == MsgType.FLOAT:
+        count, payload = 1, struct.pack("<d", float(values))
+    elif msg_type == MsgType.FLOATS or msg_type == MsgType.FLOAT_RAMP:
+        count, payload = len(values), struct.pack(f"<{len(values)}d", *values)
+    elif msg_type == MsgType.INT:
+        count, payload = 1, struct.pack("<q", int(values))
+    elif msg_type == MsgType.INTS:
+        count, payload = len(values), struct.pack(f"<{len(values)}q", *[int(v) for v in values])
+    elif msg_type == MsgType.TRIG:
+        count, payload = 0, b""
+    elif msg_type == MsgType.STRING:
+        payload = str(values).encode("utf-8")
+        count = len(payload)
+    elif msg_type == MsgType.STRINGS:
+        count, payload = len(values), _pack_strings(values)
+    else:
+        raise ValueError(f"Unknown message type: {msg_type}")
+
+    type_field = int(msg_type)
+    if isinstance(key, str):
+        key_bytes = key.encode("utf-8")
+    else:
+        key_bytes = struct.pack("<I", int(key))
+        type_field |= HANDLE_FLAG
+    key_size = _pad(len(key_bytes), 8)
+    size = _pad(RECORD_HEADER.size + key_size + len(payload), RECORD_ALIGN)
+
+    record = bytearray(size)
+    if at is None:
+        RECORD_HEADER.pack_into(record, 0, size, type_field, len(key_bytes), count, 0)
+    else:
+        RECORD_HEADER.pack_into(record, 0, size, type_field | TIMED_FLAG, len(key_bytes), count, int(at) & 0xFFFFFFFF)
+    record[RECORD_HEADER.size:RECORD_HEADER.size + len(key_bytes)] = key_bytes
+    start = RECORD_HEADER.size + key_size
+    record[start:start + len(payload)] = payload
+    return bytes(record)
+
+
+class MessageRing:
+    """Single-producer/single-consumer ring buffer of message records in shared memory.
+
+    The main process is the only producer and the audio engine is the only consumer. Several threads in the main process (the REPL, a Scheduler, an OSCServer...) may send at the same time, so writes are serialized with a `threading.Lock` that is local to the main process and never touched by the audio process.
+
+    A record is fully written, and a store barrier is issued, before the write position is advanced, so the audio engine (which reads the write position with acquire ordering) never sees a partial record. The engine in turn advances the read position only after it has read every record, and Python only overwrites a record after it has read that read position, so space is never reused while it is being read. If the ring is full (for example because audio is stopped and nothing is draining it), the message is dropped and a warning is printed.
+    """
+
+    def __init__(self, capacity: int = 1 << 20):
+        """Create the ring in a new shared-memory segment.
+
+        Args:
+            capacity: Size of the record area in bytes. Rounded up to a power of two.
+        """
+        capacity = max(RECORD_ALIGN, 1 << (int(capacity) - 1).bit_length())
+        self.capacity = capacity
+        self.shared = SharedArray(HEADER_SIZE + capacity, dtype=np.uint8)
+        self.name = self.shared.name
+        self._buf = self.shared.shm.buf
+        self._write_pos = 0
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """The whole ring (header and data) as a uint8 numpy array, for handing to the Mojo bridge."""
+        return self.shared.array
+
+    def _read_pos(self) -> int:
+        return struct.unpack_from("<Q", self._buf, READ_POS_OFFSET)[0]
+
+    def write(self, record: bytes) -> bool:
+        """Write one or more encoded records into the ring.
+
+        Everything in `record` becomes visible to the audio engine at the same time.
+
+        Args:
+            record: Bytes produced by `encode_msg` (or several of them joined together).
+
+        Returns:
+            True if the record was written, False if the ring was full and it was dropped.
+        """
+        size = len(record)
+        with self._lock:
+            if self._buf is None:
+                return False
+            w = self._write_pos
+            offset = w % self.capacity
+            space_to_end = self.capacity - offset
+            # records never wrap around the end of the ring; the tail is skipped with a PAD record
+            needed = size + (space_to_end if space_to_end < size else 0)
+
+            if w + needed - self._read_pos() > self.capacity:
+                self._dropped += 1
+                if self._dropped == 1 or self._dropped % 1000 == 0:
+                    print(f"[Main] Message ring full, dropped {self._dropped} message(s). Is audio running?")
+                    sys.stdout.flush()
+                return False
+
+            if space_to_end < size:
+                RECORD_HEADER.pack_into(self._buf, HEADER_SIZE + offset, space_to_end, int(MsgType.PAD), 0, 0, 0)
+                w += space_to_end
+                offset = 0
+
+            start = HEADER_SIZE + offset
+            self._buf[start:start + size] = record
+            w += size
+
+            # publish the record, only once its bytes are visible to the engine
+            _store_barrier()
+            struct.pack_into("<Q", self._buf, WRITE_POS_OFFSET, w)
+            self._write_pos = w
+        return True
+
+    def send(self, msg_type: MsgType, key: Union[str, int], values=None, at: Optional[int] = None) -> bool:
+        """Encode a message and write it into the ring.
+
+        Args:
+            msg_type: The `MsgType` of the message.
+            key: The message key (including any namespace) or its key handle.
+            values: The value(s) of the message.
+            at: Sample clock time to deliver the message at, or None for the next block.
+
+        Returns:
+            True if the message was written, False if it was dropped.
+        """
+        return self.write(encode_msg(msg_type, key, values, at))
+
+    def close(self):
+        """Release the shared memory of the ring."""
+        self._buf = None
+        self.shared.close()
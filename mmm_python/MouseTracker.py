@@ -0,0 +1,147 @@
+"""
+Mouse tracking for graphs that read `world[].mouse_x` and `world[].mouse_y`.
+"""
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from mmm_python.SharedArray import SharedArray
+
+# Slot layout (float64). Must match set_mouse_slot/read_mouse_slot in MMMAudioBridge.mojo.
+MOUSE_X = 0
+MOUSE_Y = 1
+MOUSE_VERSION = 2   # incremented after every new position
+SCREEN_WIDTH = 3
+SCREEN_HEIGHT = 4
+SLOT_SIZE = 8
+
+
+def graph_uses_mouse(graph_name: str, package_name: str) -> bool:
+    """Whether a graph's source reads the mouse position.
+
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+
+    Returns:
+        True if `<package>/<graph_name>.mojo`, or a module of the same package it imports, mentions `mouse_x` or `mouse_y`. False if the file can't be found, in which case the graph won't compile anyway.
+    """
+    directory = Path(*package_name.split("."))
+    pending = [graph_name]
+    seen = set()
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        try:
+            source = (directory / f"{module}.mojo").read_text(encoding="utf-8")
+        except OSError:
+            continue
+        if re.search(r"\bmouse_[xy]\b", source):
+            return True
+        # follow imports of other modules in the package, such as `from .Voice import *`
+        for name in re.findall(r"^\s*from\s+(?:\.|" + re.escape(package_name) + r"\.)?(\w+)\s+import", source, re.MULTILINE):
+            if (directory / f"{name}.mojo").is_file():
+                pending.append(name)
+    return False
+
+
+class MouseTracker:
+    """Writes the normalized mouse position into shared-memory slots read by the audio engines.
+
+    There is one tracker per main process, shared by every `MMMAudio` instance that tracks the mouse. If `pynput` is installed, it listens for mouse move events; otherwise it polls `pyautogui` and only writes when the position has changed. Each engine reads its slot once at the top of every block, so bursts of events are coalesced into one update per block, and no lock is shared with the audio callback.
+    """
+
+    _lock = threading.Lock()
+    _slots: List[SharedArray] = []
+    _targets: Tuple[np.ndarray, ...] = ()
+    _stop = threading.Event()
+    _thread: Optional[threading.Thread] = None
+    _listener = None
+    _screen = (1.0, 1.0)
+    _last = (-1.0, -1.0)
+
+    @classmethod
+    def register(cls) -> SharedArray:
+        """Create a slot that receives the mouse position, starting the tracker if needed.
+
+        Returns:
+            The slot, to be handed to the audio process and passed back to `unregister` when it stops.
+        """
+        slot = SharedArray(SLOT_SIZE, dtype=np.float64)
+        with cls._lock:
+            if not cls._slots:
+                cls._start()
+            slot.array[SCREEN_WIDTH], slot.array[SCREEN_HEIGHT] = cls._screen
+            if cls._last[0] >= 0.0:
+                slot.array[MOUSE_X], slot.array[MOUSE_Y] = cls._last
+                slot.array[MOUSE_VERSION] = 1
+            cls._slots.append(slot)
+            cls._targets = tuple(s.array for s in cls._slots)
+        return slot
+
+    @classmethod
+    def unregister(cls, slot: SharedArray):
+        """Stop writing to a slot and release it. The tracker stops when no slots are left."""
+        with cls._lock:
+            if slot in cls._slots:
+                cls._slots.remove(slot)
+                cls._targets = tuple(s.array for s in cls._slots)
+            if not cls._slots:
+                cls._halt()
+        slot.close()
+
+    @classmethod
+    def _write(cls, x: float, y: float):
+        pos = (x / cls._screen[0], y / cls._screen[1])
+        if pos == cls._last:
+            return
+        cls._last = pos
+        for target in cls._targets:
+            target[MOUSE_X] = pos[0]
+            target[MOUSE_Y] = pos[1]
+            target[MOUSE_VERSION] += 1
+
+    @classmethod
+    def _start(cls):
+        import pyautogui
+
+        size = pyautogui.size()
+        cls._screen = (float(size.width), float(size.height))
+        cls._stop.clear()
+
+        try:
+            from pynput import mouse
+            cls._listener = mouse.Listener(on_move=lambda x, y: cls._write(x, y))
+            cls._listener.start()
+            return
+        except Exception:
+            # pynput is optional, or has no access to the display
+            cls._listener = None
+
+        def poll(interval: float = 0.01):
+            while not cls._stop.is_set():
+                try:
+                    x, y = pyautogui.position()
+                    cls._write(x, y)
+                except Exception:
+                    pass
+                cls._stop.wait(interval)
+
+        cls._thread = threading.Thread(target=poll, daemon=True)
+        cls._thread.start()
+
+    @classmethod
+    def _halt(cls):
+        cls._stop.set()
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+        if cls._thread is not None:
+            cls._thread.join()
+            cls._thread = None
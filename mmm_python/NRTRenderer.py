@@ -0,0 +1,263 @@
+"""
+Offline (non-realtime) rendering of MMMAudio graphs.
+The graph runs inside the calling process, as fast as the CPU allows, without PyAudio or an audio device.
+"""
+import sys
+import time
+from math import ceil
+from typing import List, Optional
+
+import numpy as np
+
+from mmm_python.MMMAudio import MMMAudio
+from mmm_python.MessageRing import MsgType, encode_msg, ramp_values
+
+
+class NRTRenderer:
+    """Render an MMMAudio graph faster than realtime.
+
+    The graph is compiled and instantiated in the current process, so no audio device is opened and nothing is sent to an audio process. This makes it useful for batch-rendering stems, for regression tests on headless machines, and for measuring how much faster than realtime a graph runs.
+
+    Messages sent with the `send_*` methods are picked up at the top of the next rendered block, exactly as they would be in a running `MMMAudio` instance.
+
+    Example:
+        ```python
+        from mmm_python import *
+
+        nrt = NRTRenderer("DefaultGraph", "examples", blocksize=64)
+        nrt.send_float("freq", 220.0)
+        samples = nrt.write("default_graph.wav", duration=5.0)
+        print(nrt.realtime_factor)
+        ```
+    """
+
+    def __init__(
+        self,
+        graph_name: str,
+        package_name: str = "examples",
+        blocksize: int = 64,
+        sample_rate: int = 48000,
+        num_input_channels: int = 2,
+        num_output_channels: int = 2
+    ):
+        """Compile the graph and create its audio engine in this process.
+
+        Args:
+            graph_name: Name of the Mojo graph to render.
+            package_name: Name of the package containing the Mojo graph.
+            blocksize: Audio block size.
+            sample_rate: Sample rate of the render.
+            num_input_channels: Number of input channels the graph is given. Input is silent unless an input array is passed to `render`.
+            num_output_channels: Number of output channels to render.
+        """
+        self.graph_name = graph_name
+        self.package_name = package_name
+        self.blocksize = blocksize
+        self.sample_rate = sample_rate
+        self.num_input_channels = num_input_channels
+        self.num_output_channels = num_output_channels
+
+        # Timing of the most recent render
+        self.block_times = np.zeros(0, dtype=np.float64)
+        self.render_time = 0.0
+        self.realtime_factor = 0.0
+
+        MMMAudioBridge = MMMAudio.compile(graph_name, package_name)
+        if MMMAudioBridge is None:
+            raise RuntimeError(f"Could not compile Mojo graph '{graph_name}' from package '{package_name}'")
+
+        self.mmm_audio_bridge = MMMAudioBridge.MMMAudioBridge(sample_rate, blocksize)
+        self.mmm_audio_bridge.set_channel_count((num_input_channels, num_output_channels))
+
+    # =========================================================================
+    # Message sending methods (same interface as MMMAudio)
+    # =========================================================================
+
+    def _send(self, msg_type: MsgType, key: str | int, values=None):
+        # the same binary records MMMAudio writes into its message ring
+        self.mmm_audio_bridge.update_msgs(encode_msg(msg_type, key, values))
+
+    def send_bool(self, key: str | int, value: bool):
+        """Send a bool message to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.BOOL, key, value)
+
+    def send_bools(self, key: str | int, values: List[bool]):
+        """Send a list of bools to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.BOOLS, key, values)
+
+    def send_float(self, key: str | int, value: float, ramp_time: float = 0.0, curve: str = "lin"):
+        """Send a float to the graph. It is applied at the top of the next rendered block.
+
+        If `ramp_time` is greater than 0, the engine glides to `value` over that many seconds instead, with the `curve` "lin" or "exp" (see `MMMAudio.send_float`).
+        """
+        if ramp_time > 0.0:
+            self._send(MsgType.FLOAT_RAMP, key, ramp_values(value, ramp_time * self.sample_rate, curve))
+        else:
+            self._send(MsgType.FLOAT, key, value)
+
+    def send_floats(self, key: str | int, values: List[float]):
+        """Send a list of floats to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.FLOATS, key, values)
+
+    def send_int(self, key: str | int, value: int):
+        """Send an integer to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.INT, key, value)
+
+    def send_ints(self, key: str | int, values: List[int]):
+        """Send a list of integers to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.INTS, key, values)
+
+    def send_trig(self, key: str | int):
+        """Send a trigger message to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.TRIG, key)
+
+    def send_string(self, key: str | int, value: str):
+        """Send a string message to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.STRING, key, value)
+
+    def send_strings(self, key: str | int, args: List[str]):
+        """Send a list of string messages to the graph. It is applied at the top of the next rendered block."""
+        self._send(MsgType.STRINGS, key, args)
+
+    def param_handle(self, key: str) -> int:
+        """Get the integer handle the engine uses for a message key. The `send_*` methods accept it in place of the key.
+
+        Args:
+            key: The message key, including any namespace.
+        """
+        return int(self.mmm_audio_bridge.get_param_handle(key))
+
+    def upload_buffer(self, name: str, array: np.ndarray, sample_rate: Optional[float] = None, simd: bool = False) -> bool:
+        """Upload sample data into a Buffer or SIMDBuffer of the graph. The graph swaps it in at the top of the next rendered block (see `MMMAudio.upload_buffer`).
+
+        Args:
+            name: The message key of the buffer, including any namespace.
+            array: The samples, as a 1-D array for one channel or a 2-D array of shape (frames, channels).
+            sample_rate: Sample rate of the data. Defaults to the sample rate of the render.
+            simd: Upload into a `SIMDBuffer` instead of a `Buffer`. SIMDBuffers can have 1, 2, 4 or 8 channels.
+
+        Returns:
+            True if the buffer was handed to the graph.
+        """
+        data = np.asarray(array, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        if data.ndim != 2:
+            raise ValueError("upload_buffer takes a 1-D array or a 2-D array of shape (frames, channels)")
+        data = np.ascontiguousarray(data if simd else data.T)
+        rate = float(sample_rate) if sample_rate is not None else float(self.sample_rate)
+        return bool(self.mmm_audio_bridge.upload_buffer(name, data, rate, simd))
+
+    def send_msgs(self, records: bytes) -> int:
+        """Send a batch of messages in one call. They are applied at the top of the next rendered block.
+
+        Args:
+            records: Message records joined together, as built with `encode_msg`. Timestamps are ignored.
+
+        Returns:
+            The number of messages applied.
+
+        Example:
+            ```python
+            from mmm_python.MessageRing import MsgType, encode_msg
+
+            nrt.send_msgs(b"".join(encode_msg(MsgType.FLOAT, f"freq{i}", 100.0 * (i + 1)) for i in range(200)))
+            ```
+        """
+        return self.mmm_audio_bridge.update_msgs(records)
+
+    def set_mouse_pos(self, x: float, y: float):
+        """Set the normalized mouse position seen by the graph through `world[].mouse_x` and `world[].mouse_y`.
+
+        Args:
+            x: Horizontal position between 0 and 1.
+            y: Vertical position between 0 and 1.
+        """
+        self.mmm_audio_bridge.update_mouse_pos([x, y])
+
+    # =========================================================================
+    # Rendering
+    # =========================================================================
+
+    def render_samples(self, samples: int, input: Optional[np.ndarray] = None, time_blocks: bool = False) -> np.ndarray:
+        """Render a number of samples from the graph.
+
+        Rendering continues from wherever the previous render stopped, so consecutive calls produce one continuous signal. If `samples` is not a whole number of blocks, the last block of the call is a short one and the next call picks up from the following sample.
+
+        Args:
+            samples: Number of sample frames to render.
+            input: Optional array of shape (frames, channels) (or (frames,) for mono) fed to the graph's input channels. Missing frames and channels are silent.
+            time_blocks: If True, every block is rendered with its own call and timed, filling `block_times`. Otherwise all samples are rendered in one call into the engine and `block_times` is left empty.
+
+        Returns:
+            A float64 array of shape (samples, num_output_channels).
+        """
+        blocksize = self.blocksize
+        blocks = ceil(samples / blocksize)
+
+        waveform = np.zeros((samples, self.num_output_channels), dtype=np.float64)
+        in_buf = np.zeros((samples, self.num_input_channels), dtype=np.float32)
+
+        if input is not None and self.num_input_channels > 0:
+            input = np.asarray(input, dtype=np.float32)
+            input = input.reshape(input.shape[0], -1)
+            frames = min(input.shape[0], samples)
+            chans = min(input.shape[1], self.num_input_channels)
+            in_buf[:frames, :chans] = input[:frames, :chans]
+
+        block_times = np.zeros(blocks if time_blocks else 0, dtype=np.float64)
+
+        start = time.perf_counter()
+        if time_blocks:
+            # Row slices of C-ordered arrays are contiguous, so each block is
+            # rendered straight into its place in the output. The slices of
+            # the last block stop at the end of the arrays.
+            for i in range(blocks):
+                block_start = time.perf_counter()
+                self.mmm_audio_bridge.next(
+                    in_buf[i * blocksize:(i + 1) * blocksize],
+                    waveform[i * blocksize:(i + 1) * blocksize]
+                )
+                block_times[i] = time.perf_counter() - block_start
+        else:
+            # the bridge splits the buffer into blocks, the last one short
+            self.mmm_audio_bridge.next(in_buf, waveform)
+        self.render_time = time.perf_counter() - start
+
+        self.block_times = block_times
+        self.realtime_factor = (samples / self.sample_rate) / self.render_time if self.render_time > 0 else float("inf")
+
+        return waveform
+
+    def render(self, duration: float, input: Optional[np.ndarray] = None, time_blocks: bool = False) -> np.ndarray:
+        """Render a duration of audio from the graph.
+
+        Args:
+            duration: Length of the render in seconds.
+            input: Optional array of shape (frames, channels) fed to the graph's input channels.
+            time_blocks: If True, time every block into `block_times` (see `render_samples`).
+
+        Returns:
+            A float64 array of shape (frames, num_output_channels).
+        """
+        return self.render_samples(int(round(duration * self.sample_rate)), input, time_blocks)
+
+    def write(self, file_name: str, duration: float, input: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render a duration of audio from the graph and write it to a 32-bit float WAV file.
+
+        Args:
+            file_name: Path of the WAV file to write.
+            duration: Length of the render in seconds.
+            input: Optional array of shape (frames, channels) fed to the graph's input channels.
+
+        Returns:
+            The rendered float64 array of shape (frames, num_output_channels).
+        """
+        from scipy.io import wavfile
+
+        waveform = self.render(duration, input)
+        wavfile.write(file_name, self.sample_rate, waveform.astype(np.float32))
+        print(f"Rendered {duration} s of '{self.graph_name}' to {file_name} ({self.realtime_factor:.1f}x realtime)")
+        sys.stdout.flush()
+
+        return waveform
@@ -0,0 +1,74 @@
+"""
+Numpy arrays backed by named shared memory, used to pass data between the main process and the audio process without pickling.
+"""
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SharedArray:
+    """A numpy array that lives in a named shared-memory segment.
+
+    The process that creates a `SharedArray` owns the segment and is responsible for unlinking it. Any other process attaches to the same memory by name. Pickling a `SharedArray` (for example by passing it as an argument to a `multiprocessing.Process`) only sends the name, shape and dtype, and the receiving process attaches to the existing segment.
+
+    The `array` attribute is a regular numpy array, so it can be handed straight to the Mojo bridge, which reads its address from `__array_interface__`.
+    """
+
+    def __init__(self, shape: Tuple[int, ...] | int, dtype=np.float64, name: Optional[str] = None):
+        """Create a new shared array, or attach to an existing one.
+
+        Args:
+            shape: Shape of the array.
+            dtype: Numpy dtype of the array.
+            name: Name of an existing segment to attach to. If None, a new zeroed segment is created and owned by this instance.
+        """
+        self.shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.shm = SharedArray._attach(name)
+            self.owner = False
+
+        self.name = self.shm.name
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        if self.owner:
+            self.array.fill(0)
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        # Attaching processes must not register the segment with the resource
+        # tracker, or it will be unlinked when the first of them exits.
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13
+            return shared_memory.SharedMemory(name=name)
+
+    def __getstate__(self):
+        return (self.name, self.shape, self.dtype.str)
+
+    def __setstate__(self, state):
+        name, shape, dtype = state
+        self.__init__(shape, dtype, name)
+
+    def close(self):
+        """Release this process's mapping of the segment. The owner also unlinks it so the memory is freed once every process has closed it."""
+        if self.shm is None:
+            return
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # numpy views of the memory are still alive somewhere; the mapping
+            # is released when they are garbage collected or the process exits
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = None
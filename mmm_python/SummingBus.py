@@ -0,0 +1,158 @@
+"""
+Shared-memory summing bus, so several MMMAudio processes can feed a single output device.
+"""
+from typing import Optional
+
+import numpy as np
+
+from mmm_python.MessageRing import _store_barrier
+from mmm_python.SharedArray import SharedArray
+
+# Header layout (int64). Every counter sits on its own 64 byte cache line.
+MASTER_BLOCK = 0       # number of blocks the master has consumed
+SAMPLE_RATE = 1        # written by the master when its audio process starts
+WORKERS = 8            # first worker line
+# offsets inside a worker line
+WORKER_BLOCK = 0       # number of blocks the worker has published
+WORKER_ACTIVE = 1      # 1 while the worker is rendering
+WORKER_MISSES = 2      # blocks the master had to play without this worker
+LINE = 8
+
+
+class SummingBus:
+    """Blocks rendered by worker processes, summed by one master process that owns the audio device.
+
+    Every worker renders its graph into its own ring of `num_slots` block slots in shared memory and publishes a block counter after each block. The master renders its own graph in the device callback, adds the block with the master's current block number from every worker, and advances the master block counter. That counter is the barrier: a worker never renders more than `num_slots - 1` blocks ahead of the master, and it skips forward if it falls behind. A worker whose block isn't ready in time is left out of that block and counted as a miss instead of stalling the device.
+
+    The bus is passed to `MMMAudio` with the `bus` argument. The instance created without `bus_slot` is the master, and every instance with a `bus_slot` is a worker that doesn't open an output stream.
+
+    Example:
+        ```python
+        from mmm_python import *
+
+        bus = SummingBus(num_workers=4, blocksize=128)
+        master = MMMAudio(128, graph_name="DefaultGraph", bus=bus)
+        workers = [MMMAudio(128, graph_name="ParallelGraphs", out_device=None, in_device=None, bus=bus, bus_slot=i) for i in range(4)]
+        master.start_audio()
+        for w in workers:
+            w.start_audio()
+        ```
+    """
+
+    def __init__(self, num_workers: int, blocksize: int = 64, num_channels: int = 2, num_slots: int = 2):
+        """Create the bus in shared memory.
+
+        Args:
+            num_workers: Number of worker slots.
+            blocksize: Audio block size. Must match the block size of every instance on the bus.
+            num_channels: Number of output channels carried by the bus.
+            num_slots: Number of blocks in each worker's ring. A worker renders at most `num_slots - 1` blocks ahead of the master, so each extra slot adds one block of latency and one block of headroom.
+        """
+        self.num_workers = num_workers
+        self.blocksize = blocksize
+        self.num_channels = num_channels
+        self.num_slots = max(2, num_slots)
+        self.header_shared = SharedArray(WORKERS + LINE * num_workers, dtype=np.int64)
+        self.data_shared = SharedArray((num_workers, self.num_slots, blocksize, num_channels), dtype=np.float32)
+        self._attach_arrays()
+
+    def _attach_arrays(self):
+        self.header = self.header_shared.array
+        self.data = self.data_shared.array
+        self._workers = self.header[WORKERS:].reshape(self.num_workers, LINE)
+
+    def __getstate__(self):
+        return (self.num_workers, self.blocksize, self.num_channels, self.num_slots, self.header_shared, self.data_shared)
+
+    def __setstate__(self, state):
+        self.num_workers, self.blocksize, self.num_channels, self.num_slots, self.header_shared, self.data_shared = state
+        self._attach_arrays()
+
+    # =========================================================================
+    # Master side
+    # =========================================================================
+
+    def set_sample_rate(self, sample_rate: int):
+        """Publish the master's sample rate, which the workers run at."""
+        self.header[SAMPLE_RATE] = sample_rate
+
+    def mix_into(self, out: np.ndarray):
+        """Add the workers' blocks for the current master block to `out` and advance the master block counter.
+
+        Called by the master after rendering its own block.
+
+        Args:
+            out: The master's output block, shape (blocksize, channels).
+        """
+        block = int(self.header[MASTER_BLOCK])
+        slot = block % self.num_slots
+        chans = min(out.shape[1], self.num_channels)
+        workers = self._workers
+        ready = []
+        for i in range(self.num_workers):
+            if workers[i, WORKER_ACTIVE] == 0:
+                continue
+            if workers[i, WORKER_BLOCK] > block:
+                ready.append(i)
+            else:
+                workers[i, WORKER_MISSES] += 1
+        if ready:
+            # pairs with the barrier in publish: the slots are read only after the counters that cover them
+            _store_barrier()
+            for i in ready:
+                out[:, :chans] += self.data[i, slot, :, :chans]
+        self.header[MASTER_BLOCK] = block + 1
+
+    # =========================================================================
+    # Worker side
+    # =========================================================================
+
+    def wait_for_sample_rate(self, timeout: float = 10.0) -> int:
+        """Wait until the master has published its sample rate and return it (0 on timeout)."""
+        import time
+
+        end = time.perf_counter() + timeout
+        while self.header[SAMPLE_RATE] == 0 and time.perf_counter() < end:
+            time.sleep(0.01)
+        return int(self.header[SAMPLE_RATE])
+
+    def set_active(self, worker: int, active: bool):
+        """Tell the master whether a worker is rendering. Inactive workers are not counted as missing."""
+        if active and self._workers[worker, WORKER_ACTIVE] == 0:
+            # start with the block the master is about to play
+            self._workers[worker, WORKER_BLOCK] = self.header[MASTER_BLOCK]
+        self._workers[worker, WORKER_ACTIVE] = 1 if active else 0
+
+    def next_block(self, worker: int) -> Optional[np.ndarray]:
+        """Return the slot the worker should render its next block into, or None if it is already far enough ahead of the master.
+
+        Args:
+            worker: Index of the worker.
+        """
+        master_block = self.header[MASTER_BLOCK]
+        block = self._workers[worker, WORKER_BLOCK]
+        if block < master_block:
+            # fell behind: skip the blocks the master has already played
+            block = master_block
+            self._workers[worker, WORKER_BLOCK] = block
+        if block - master_block >= self.num_slots:
+            return None
+        return self.data[worker, block % self.num_slots]
+
+    def publish(self, worker: int):
+        """Make the block rendered into the slot from `next_block` visible to the master."""
+        # the samples of the block must reach the master before the counter that covers them
+        _store_barrier()
+        self._workers[worker, WORKER_BLOCK] += 1
+
+    def misses(self, worker: int) -> int:
+        """Number of blocks the master played without this worker because its block was late."""
+        return int(self._workers[worker, WORKER_MISSES])
+
+    def close(self):
+        """Release the shared memory of the bus. The process that created the bus also unlinks it."""
+        self.header = None
+        self.data = None
+        self._workers = None
+        self.header_shared.close()
+        self.data_shared.close()
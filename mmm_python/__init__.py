@@ -1,10 +1,37 @@
 from mmm_python.MMMAudio import *
+from mmm_python.NRTRenderer import *
 from mmm_python.functions import *
 from mmm_python.Patterns import *
 import asyncio
 from asyncio import sleep
-from mmm_python.OSCServer import *
 from mmm_python.Scheduler import *
-from mmm_python.GUI import *
-from mmm_python.hid_devices import *
-from mmm_python.BufAnalysis import *
\ No newline at end of file
+
+# The GUI (PySide6, matplotlib), OSC (pythonosc), HID (hid) and buffer
+# analysis (compiles a Mojo bridge) modules are slow to import, so their
+# classes are loaded on first use instead. `from mmm_python import *` does not
+# include them; import them by name, e.g. `from mmm_python import Handle`.
+_lazy_attributes = {
+    "ControlSpec": "mmm_python.GUI",
+    "Handle": "mmm_python.GUI",
+    "Slider2D": "mmm_python.GUI",
+    "MPlot": "mmm_python.GUI",
+    "MWaveform": "mmm_python.GUI",
+    "OSCServer": "mmm_python.OSCServer",
+    "Joystick": "mmm_python.hid_devices",
+    "list_hid_devices": "mmm_python.hid_devices",
+    "MBufAnalysis": "mmm_python.BufAnalysis",
+}
+
+def __getattr__(name):
+    module_name = _lazy_attributes.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'mmm_python' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    # importing the module may have bound its name on the package (OSCServer), so
+    # overwrite it with the class
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_attributes))
@@ -0,0 +1,166 @@
+"""
+Content-addressed cache of compiled MMMAudio bridge modules.
+
+Compiling a graph's bridge takes seconds to tens of seconds. The compiled shared library only depends on the bridge source, the Mojo sources it imports and the compiler, so it is stored under a hash of those and reused by every later process that asks for the same graph.
+"""
+import hashlib
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+
+def cache_dir() -> Path:
+    """Directory of the bridge cache. Set the `MMM_AUDIO_CACHE` environment variable to move it."""
+    return Path(os.environ.get("MMM_AUDIO_CACHE", Path.home() / ".cache" / "mmm_audio" / "bridges"))
+
+
+@lru_cache(maxsize=1)
+def compiler_version() -> str:
+    """The version string of the Mojo compiler, or an empty string if it can't be found."""
+    try:
+        result = subprocess.run(["mojo", "--version"], capture_output=True, text=True, timeout=30)
+        return result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _hash_tree(h, root: Path):
+    for path in sorted(root.rglob("*.mojo")):
+        h.update(str(path.relative_to(root)).encode("utf-8"))
+        h.update(b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+
+
+def bridge_key(graph_name: str, package_name: str, bridge_source: str) -> str:
+    """Hash of everything a compiled bridge depends on.
+
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+        bridge_source: Source of the generated `<graph_name>Bridge.mojo`.
+
+    Returns:
+        A hex digest that changes whenever the bridge, the `mmm_audio` sources, the graph's package or the compiler change.
+    """
+    h = hashlib.sha256()
+    h.update(graph_name.encode("utf-8") + b"\0")
+    h.update(bridge_source.encode("utf-8") + b"\0")
+    h.update(compiler_version().encode("utf-8") + b"\0")
+    _hash_tree(h, Path("mmm_audio"))
+    # hash the whole top level package, so graphs in examples.tests also see
+    # changes to modules they import from examples
+    package_root = Path(package_name.split(".")[0])
+    if package_root.is_dir():
+        _hash_tree(h, package_root)
+    return h.hexdigest()
+
+
+def _library_path(graph_name: str, key: str) -> Path:
+    return cache_dir() / f"{graph_name}Bridge-{key[:24]}" / f"{graph_name}Bridge.so"
+
+
+def _load(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+def load_cached_bridge(graph_name: str, package_name: str, bridge_source: str):
+    """Import a compiled bridge from the cache.
+
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+        bridge_source: Source of the generated `<graph_name>Bridge.mojo`.
+
+    Returns:
+        The bridge module, or None if it is not in the cache.
+    """
+    path = _library_path(graph_name, bridge_key(graph_name, package_name, bridge_source))
+    if not path.exists():
+        return None
+    return _load(f"{graph_name}Bridge", path)
+
+
+def build_bridge(graph_name: str, package_name: str, bridge_file: str) -> Optional[Path]:
+    """Compile a generated bridge file into the cache.
+
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+        bridge_file: Path of the generated `<graph_name>Bridge.mojo`.
+
+    Returns:
+        Path of the compiled library, or None if the Mojo compiler is not available or the build failed.
+    """
+    with open(bridge_file, "r", encoding="utf-8") as f:
+        bridge_source = f.read()
+    path = _library_path(graph_name, bridge_key(graph_name, package_name, bridge_source))
+    if path.exists():
+        return path
+    if shutil.which("mojo") is None:
+        return None
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # build next to the final location and rename, so processes compiling the
+    # same graph at the same time never load a half-written library
+    fd, tmp_path = tempfile.mkstemp(suffix=".so", dir=path.parent)
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            ["mojo", "build", "--emit", "shared-lib", "-I", ".", bridge_file, "-o", tmp_path],
+            capture_output=True, text=True
+        )
+    except OSError:
+        os.remove(tmp_path)
+        return None
+    if result.returncode != 0:
+        os.remove(tmp_path)
+        print(f"Error building Mojo bridge for '{graph_name}':\n{result.stderr}")
+        sys.stdout.flush()
+        return None
+    os.replace(tmp_path, path)
+    return path
+
+
+def compile_bridge(graph_name: str, package_name: str):
+    """Return the compiled bridge module for a graph, compiling it only if it is not cached.
+
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+
+    Returns:
+        The bridge module, or None if it could not be built with the Mojo compiler.
+    """
+    from mmm_python.make_solo_graph import solo_graph_source, make_solo_graph
+
+    module = load_cached_bridge(graph_name, package_name, solo_graph_source(graph_name, package_name))
+    if module is not None:
+        return module
+
+    # every build writes its source to its own directory, so processes compiling the
+    # same graph at the same time can't delete each other's source
+    build_dir = tempfile.mkdtemp(prefix=f"{graph_name}Bridge-")
+    try:
+        bridge_file = make_solo_graph(graph_name, package_name, build_dir)
+        path = build_bridge(graph_name, package_name, bridge_file)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    if path is None:
+        return None
+    return _load(f"{graph_name}Bridge", path)
+
+
+def clear_bridge_cache():
+    """Delete every compiled bridge in the cache."""
+    shutil.rmtree(cache_dir(), ignore_errors=True)
@@ -1,11 +1,23 @@
+import os
 
-def make_solo_graph(graph_name: str, package_name: str) -> str:
-    """This is used during compilation to make a solo graph from the MMMAudioBridge.mojo file."""
+
+def solo_graph_source(graph_name: str, package_name: str) -> str:
+    """Return the source of the solo graph bridge made from the MMMAudioBridge.mojo file."""
     with open("./mmm_audio/MMMAudioBridge.mojo", "r", encoding="utf-8") as src:
-        string = src.read()  
+        string = src.read()
         string = string.replace("examples", package_name)
         string = string.replace("Grains", graph_name)
+    return string
 
-    with open(graph_name + "Bridge" + ".mojo", "w") as file:
-        file.write(string)
+def make_solo_graph(graph_name: str, package_name: str, directory: str = ".") -> str:
+    """This is used during compilation to make a solo graph from the MMMAudioBridge.mojo file. Returns the name of the file written.
 
+    Args:
+        graph_name: Name of the Mojo graph.
+        package_name: Name of the package containing the Mojo graph.
+        directory: Directory to write `<graph_name>Bridge.mojo` into. The Mojo importer needs it in the working directory, the compiler doesn't.
+    """
+    file_name = os.path.join(directory, graph_name + "Bridge" + ".mojo")
+    with open(file_name, "w") as file:
+        file.write(solo_graph_source(graph_name, package_name))
+    return file_name
@@ -0,0 +1,98 @@
+"""
+Helpers to pin threads to CPU cores and give them realtime priority. They are used by the audio process of MMMAudio and only do anything on Linux, where affinity, scheduling policy and nice value are all per thread.
+"""
+import os
+import sys
+import threading
+from typing import Iterable, Optional, Set
+
+
+def _supported(what: str) -> bool:
+    if sys.platform.startswith("linux"):
+        return True
+    print(f"[PID {os.getpid()}] {what} is only supported on Linux, ignoring it")
+    sys.stdout.flush()
+    return False
+
+
+def available_cpus() -> Set[int]:
+    """The cores the current process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def set_thread_affinity(cpus: Iterable[int]) -> bool:
+    """Pin the calling thread to a set of cores. Threads it creates afterwards inherit the set.
+
+    Args:
+        cpus: Indices of the cores the thread may run on.
+
+    Returns:
+        True if the affinity was set.
+    """
+    cpus = set(cpus)
+    if not cpus or not _supported("CPU affinity"):
+        return False
+    try:
+        # pid 0 is the calling thread
+        os.sched_setaffinity(0, cpus)
+        return True
+    except OSError as e:
+        print(f"[PID {os.getpid()}] Could not set CPU affinity {sorted(cpus)}: {e}")
+        sys.stdout.flush()
+        return False
+
+
+def set_thread_realtime(priority: int) -> bool:
+    """Switch the calling thread to the SCHED_FIFO realtime policy.
+
+    This needs the CAP_SYS_NICE capability or an rtprio limit (see /etc/security/limits.conf). Without it a warning is printed and the thread keeps its normal policy.
+
+    Args:
+        priority: SCHED_FIFO priority, between 1 and 99.
+
+    Returns:
+        True if the policy was set.
+    """
+    if not _supported("SCHED_FIFO"):
+        return False
+    try:
+        priority = max(os.sched_get_priority_min(os.SCHED_FIFO), min(priority, os.sched_get_priority_max(os.SCHED_FIFO)))
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        return True
+    except (OSError, AttributeError) as e:
+        print(f"[PID {os.getpid()}] Could not set SCHED_FIFO priority {priority}: {e}")
+        sys.stdout.flush()
+        return False
+
+
+def set_thread_nice(nice: int) -> bool:
+    """Set the nice value of the calling thread. Negative values need the same permissions as `set_thread_realtime`.
+
+    Args:
+        nice: Nice value, between -20 (highest priority) and 19.
+
+    Returns:
+        True if the nice value was set.
+    """
+    if not _supported("Thread nice values"):
+        return False
+    try:
+        # on Linux the nice value belongs to the thread id, not the process
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+        return True
+    except OSError as e:
+        print(f"[PID {os.getpid()}] Could not set nice value {nice}: {e}")
+        sys.stdout.flush()
+        return False
+
+
+def configure_audio_thread(cpu_affinity: Optional[Iterable[int]], realtime_priority: Optional[int], nice: Optional[int]):
+    """Apply the MMMAudio realtime options to the calling (audio callback) thread. Options that are None are left alone."""
+    if cpu_affinity is not None:
+        set_thread_affinity(cpu_affinity)
+    if realtime_priority is not None:
+        set_thread_realtime(realtime_priority)
+    if nice is not None:
+        set_thread_nice(nice)
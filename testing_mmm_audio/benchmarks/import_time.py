@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark for `import mmm_python`.
+
+Runs the import in fresh interpreters with `python -X importtime`, reports the
+best cumulative time and the slowest modules, and optionally compares the
+result against a saved baseline.
+
+    python testing_mmm_audio/benchmarks/import_time.py
+    python testing_mmm_audio/benchmarks/import_time.py --save
+    python testing_mmm_audio/benchmarks/import_time.py --check --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def repo_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def baseline_path() -> str:
+    return os.path.join(repo_root(), "testing_mmm_audio", "benchmarks", "import_time_baseline.json")
+
+
+def run_importtime(statement: str) -> dict[str, tuple[int, int]]:
+    """Run `statement` in a new interpreter and return {module: (self_us, cumulative_us)} for every import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=repo_root(),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr}")
+
+    modules: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def measure(module: str, repeats: int) -> dict[str, Any]:
+    best: dict[str, tuple[int, int]] | None = None
+    for _ in range(repeats):
+        modules = run_importtime(f"import {module}")
+        if module not in modules:
+            raise RuntimeError(f"{module} was not imported")
+        if best is None or modules[module][1] < best[module][1]:
+            best = modules
+    assert best is not None
+
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:15]
+    return {
+        "module": module,
+        "cumulative_ms": best[module][1] / 1000.0,
+        "num_modules": len(best),
+        "slowest_self_ms": {name: times[0] / 1000.0 for name, times in slowest},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the cold import time of mmm_python with -X importtime.")
+    parser.add_argument("--module", default="mmm_python", help="Module to import.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters to run; the fastest is reported.")
+    parser.add_argument("--save", action="store_true", help="Write the result as the new baseline.")
+    parser.add_argument("--check", action="store_true", help="Fail if the import is slower than the baseline by more than --tolerance.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown for --check.")
+    args = parser.parse_args()
+
+    result = measure(args.module, args.repeats)
+
+    print(f"import {result['module']}: {result['cumulative_ms']:.1f} ms ({result['num_modules']} modules)")
+    print("slowest modules (self time):")
+    for name, ms in result["slowest_self_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.save:
+        with open(baseline_path(), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved baseline to {baseline_path()}")
+        return 0
+
+    if os.path.exists(baseline_path()):
+        with open(baseline_path(), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("module") == result["module"]:
+            ratio = result["cumulative_ms"] / baseline["cumulative_ms"]
+            print(f"baseline: {baseline['cumulative_ms']:.1f} ms ({ratio:.2f}x)")
+            if args.check and ratio > 1.0 + args.tolerance:
+                print(f"FAIL: import is {100.0 * (ratio - 1.0):.0f}% slower than the baseline")
+                return 1
+    elif args.check:
+        print(f"No baseline at {baseline_path()}, skipping the check. Record one with --save.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Realtime-factor benchmark for every graph in examples/ and examples/tests/.
+
+Each graph is rendered offline with `NRTRenderer` for a fixed duration at every
+combination of block size and sample rate. The realtime factor and the
+distribution of per-block render times are written to JSON and, like
+validate_against_snapshot.py does for accuracy, compared against a saved baseline.
+
+    python testing_mmm_audio/benchmarks/realtime_factor.py
+    python testing_mmm_audio/benchmarks/realtime_factor.py --save
+    python testing_mmm_audio/benchmarks/realtime_factor.py --check --tolerance 0.1
+    python testing_mmm_audio/benchmarks/realtime_factor.py --graphs Grains NessStretch --block-sizes 64
+
+Every graph runs in its own interpreter, so a graph that fails to build or
+crashes is reported without stopping the others. Baselines only mean something
+on the machine they were saved on, so none is committed. Record one on your
+machine before checking against it:
+
+    pixi run benchmark_save
+
+Until a baseline exists, --check (and so `pixi run benchmark`) reports the
+results and skips the comparison.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any
+
+RESULT_PREFIX = "RESULT "
+
+
+def repo_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def baseline_path() -> str:
+    return os.path.join(repo_root(), "testing_mmm_audio", "benchmarks", "realtime_factor_baseline.json")
+
+
+def find_graphs() -> list[tuple[str, str]]:
+    """Return (graph_name, package_name) for every example file that defines a graph struct named after the file."""
+    graphs = []
+    for package in ("examples", "examples.tests"):
+        directory = os.path.join(repo_root(), *package.split("."))
+        for path in sorted(glob.glob(os.path.join(directory, "*.mojo"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            if (
+                re.search(rf"^struct\s+{re.escape(name)}\b", source, re.MULTILINE)
+                and re.search(r"def __init__\(out self, world: World\)", source)
+                and re.search(r"def next\(mut self\)", source)
+            ):
+                graphs.append((name, package))
+    return graphs
+
+
+def config_key(blocksize: int, sample_rate: int) -> str:
+    return f"bs{blocksize}_sr{sample_rate}"
+
+
+def benchmark_graph(graph_name: str, package_name: str, block_sizes: list[int], sample_rates: list[int], duration: float, warmup: float) -> dict[str, Any]:
+    """Render one graph at every configuration. Runs inside the worker interpreter."""
+    import numpy as np
+
+    from mmm_python.NRTRenderer import NRTRenderer
+
+    results = {}
+    for sample_rate in sample_rates:
+        for blocksize in block_sizes:
+            nrt = NRTRenderer(graph_name, package_name, blocksize=blocksize, sample_rate=sample_rate)
+            if warmup > 0:
+                nrt.render(warmup)
+            nrt.render(duration, time_blocks=True)
+            block_us = nrt.block_times * 1e6
+            results[config_key(blocksize, sample_rate)] = {
+                "blocksize": blocksize,
+                "sample_rate": sample_rate,
+                "realtime_factor": nrt.realtime_factor,
+                "block_mean_us": float(np.mean(block_us)),
+                "block_p50_us": float(np.percentile(block_us, 50)),
+                "block_p99_us": float(np.percentile(block_us, 99)),
+                "block_max_us": float(np.max(block_us)),
+                "deadline_us": blocksize / sample_rate * 1e6,
+            }
+    return results
+
+
+def run_worker(graph_name: str, package_name: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Benchmark one graph in a fresh interpreter and return its results, or an error."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__),
+        "--worker", graph_name, package_name,
+        "--duration", str(args.duration),
+        "--warmup", str(args.warmup),
+        "--block-sizes", *[str(b) for b in args.block_sizes],
+        "--sample-rates", *[str(s) for s in args.sample_rates],
+    ]
+    proc = subprocess.run(cmd, cwd=repo_root(), capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return {"configs": json.loads(line[len(RESULT_PREFIX):])}
+    error = (proc.stderr.strip() or proc.stdout.strip()).splitlines()
+    return {"error": error[-1] if error else f"exit code {proc.returncode}"}
+
+
+def compare(expected: dict[str, Any], actual: dict[str, Any], tolerance: float) -> tuple[list[str], list[str]]:
+    """Compare realtime factors against the baseline. Returns (regressions, notes)."""
+    regressions: list[str] = []
+    notes: list[str] = []
+    for graph, exp in sorted(expected["graphs"].items()):
+        act = actual["graphs"].get(graph)
+        if act is None:
+            continue
+        if "error" in act:
+            if "error" not in exp:
+                regressions.append(f"{graph}: failed ({act['error']})")
+            continue
+        for key, exp_config in exp.get("configs", {}).items():
+            act_config = act["configs"].get(key)
+            if act_config is None:
+                continue
+            ratio = act_config["realtime_factor"] / exp_config["realtime_factor"]
+            line = f"{graph} {key}: {exp_config['realtime_factor']:.1f}x -> {act_config['realtime_factor']:.1f}x ({100.0 * (ratio - 1.0):+.0f}%)"
+            if ratio < 1.0 - tolerance:
+                regressions.append(line)
+            elif ratio > 1.0 + tolerance:
+                notes.append(line)
+    return regressions, notes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the realtime factor of every example graph and compare it against a baseline.")
+    parser.add_argument("--graphs", nargs="*", help="Only benchmark these graphs (default: all graphs in examples/ and examples/tests/).")
+    parser.add_argument("--block-sizes", nargs="+", type=int, default=[64, 128, 512])
+    parser.add_argument("--sample-rates", nargs="+", type=int, default=[48000, 96000])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of audio rendered per configuration.")
+    parser.add_argument("--warmup", type=float, default=0.5, help="Seconds rendered before measuring.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--check", action="store_true", help="Fail if any configuration is slower than the baseline by more than --tolerance.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative drop of the realtime factor for --check.")
+    parser.add_argument("--no-precompile", action="store_true", help="Don't compile all graphs in parallel before benchmarking.")
+    parser.add_argument("--worker", nargs=2, metavar=("GRAPH", "PACKAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, repo_root())
+
+    if args.worker:
+        os.chdir(repo_root())
+        results = benchmark_graph(*args.worker, args.block_sizes, args.sample_rates, args.duration, args.warmup)
+        print(RESULT_PREFIX + json.dumps(results))
+        return 0
+
+    graphs = find_graphs()
+    if args.graphs:
+        graphs = [g for g in graphs if g[0] in args.graphs]
+    if not graphs:
+        print("No graphs to benchmark.", file=sys.stderr)
+        return 1
+
+    if not args.no_precompile:
+        os.chdir(repo_root())
+        from mmm_python.MMMAudio import MMMAudio
+        MMMAudio.precompile(graphs)
+
+    actual: dict[str, Any] = {
+        "block_sizes": args.block_sizes,
+        "sample_rates": args.sample_rates,
+        "duration": args.duration,
+        "graphs": {},
+    }
+    for graph_name, package_name in graphs:
+        print(f"Benchmarking {package_name}.{graph_name}...")
+        sys.stdout.flush()
+        result = run_worker(graph_name, package_name, args)
+        actual["graphs"][f"{package_name}.{graph_name}"] = result
+        if "error" in result:
+            print(f"  failed: {result['error']}")
+            continue
+        for key, config in result["configs"].items():
+            print(f"  {key:>14}: {config['realtime_factor']:8.1f}x realtime, block p50 {config['block_p50_us']:.1f} us, p99 {config['block_p99_us']:.1f} us (deadline {config['deadline_us']:.0f} us)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=2)
+
+    if args.save:
+        with open(baseline_path(), "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=2)
+        print(f"Saved baseline to {baseline_path()}")
+        return 0
+
+    if not os.path.exists(baseline_path()):
+        if args.check:
+            print(f"No baseline at {baseline_path()}, skipping the check. Record one with --save (pixi run benchmark_save).")
+        return 0
+
+    with open(baseline_path(), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    regressions, notes = compare(expected, actual, args.tolerance)
+
+    if notes:
+        print("Faster than the baseline:")
+        for note in notes:
+            print(f"- {note}")
+    if regressions:
+        print("Slower than the baseline:")
+        for regression in regressions:
+            print(f"- {regression}")
+        return 1 if args.check else 0
+
+    print("Benchmark PASSED: no graph is slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
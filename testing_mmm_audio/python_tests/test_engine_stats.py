@@ -0,0 +1,83 @@
+"""
+Tests of the engine clock and the block statistics in EngineStats.
+"""
+import time
+
+import pytest
+
+from mmm_python.EngineStats import CLOCK, CLOCK_TIME, ENGINE_CLOCK, PA_INPUT_OVERFLOW, PA_OUTPUT_UNDERFLOW, EngineStats
+
+
+@pytest.fixture
+def stats():
+    stats = EngineStats()
+    stats.set_deadline(480, 48000)
+    yield stats
+    stats.close()
+
+
+def test_status_flags(stats):
+    stats.record_status(0)
+    stats.record_status(PA_OUTPUT_UNDERFLOW | PA_INPUT_OVERFLOW)
+    stats.record_status(PA_OUTPUT_UNDERFLOW)
+    stats.record_dropped_input(3)
+
+    snapshot = stats.snapshot()
+    assert (snapshot["xruns"], snapshot["input_overflows"], snapshot["dropped_input"]) == (2, 1, 3)
+
+
+def test_reset(stats):
+    stats.record_block(0.002, 1.0)
+    stats.record_status(PA_OUTPUT_UNDERFLOW | PA_INPUT_OVERFLOW)
+    stats.reset()
+    stats.record_block(0.001, 1.01)
+
+    snapshot = stats.snapshot()
+    assert snapshot["blocks"] == 1
+    assert (snapshot["xruns"], snapshot["input_overflows"]) == (0, 0)
+    assert snapshot["deadline_ms"] == pytest.approx(10.0)
+
+
+def test_sample_clock_before_any_block(stats):
+    assert stats.sample_clock(48000) == 0
+
+
+def test_sample_clock_extrapolates(stats, monkeypatch):
+    # the engine publishes its clock at the start of the callback...
+    stats.clock_slot[0] = 96000
+    stats.record_block(0.001, 100.0)
+    assert (stats.values[CLOCK], stats.values[CLOCK_TIME]) == (96000, 100.0)
+
+    # ...and the clock advances at the sample rate from the callback's start time
+    monkeypatch.setattr(time, "perf_counter", lambda: 100.25)
+    assert stats.sample_clock(48000) == 96000 + 12000
+
+    # a reading taken before the callback time never runs backwards
+    monkeypatch.setattr(time, "perf_counter", lambda: 99.0)
+    assert stats.sample_clock(48000) == 96000
+
+
+def test_reset_keeps_the_clock(stats):
+    stats.clock_slot[0] = 480
+    stats.record_block(0.002, 1.0)
+    stats.reset()
+    stats.clock_slot[0] = 960
+    stats.record_block(0.001, 1.01)
+    assert stats.values[CLOCK] == 960
+    assert stats.values[ENGINE_CLOCK] == 960
+
+
+def test_block_statistics(stats):
+    # a deadline of 10 ms, with callbacks 1 ms late and then on time
+    stats.record_block(0.005, 1.0)
+    stats.record_block(0.010, 1.011)
+    stats.record_block(0.002, 1.021)
+
+    snapshot = stats.snapshot()
+    assert snapshot["blocks"] == 3
+    assert snapshot["deadline_ms"] == pytest.approx(10.0)
+    assert snapshot["dsp_load"] == pytest.approx(100.0 * 0.017 / 0.030)
+    assert snapshot["dsp_load_peak"] == pytest.approx(100.0)
+    assert snapshot["max_ms"] == pytest.approx(10.0)
+    assert snapshot["jitter_ms"] == pytest.approx(0.5)
+    assert snapshot["jitter_max_ms"] == pytest.approx(1.0)
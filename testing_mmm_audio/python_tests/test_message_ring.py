@@ -0,0 +1,122 @@
+"""
+Tests of the Python side of the message ring: the record encoding and the producer's handling of wraparound and a full ring.
+
+The engine side is tested in UnitTests.mojo. Here `drain` plays the engine, reading records the way `MessageRing.drain` in MessageRing_Module.mojo does.
+"""
+import struct
+
+import pytest
+
+from mmm_python.MessageRing import (
+    HANDLE_FLAG, HEADER_SIZE, READ_POS_OFFSET, RECORD_ALIGN, RECORD_HEADER, TIMED_FLAG, WRITE_POS_OFFSET,
+    MessageRing, MsgType, encode_msg, ramp_values,
+)
+
+
+@pytest.fixture
+def ring():
+    ring = MessageRing(256)
+    yield ring
+    ring.close()
+
+
+def drain(ring: MessageRing) -> list[tuple[int, int, int]]:
+    """Consume every published record. Returns (offset, type, size) of each record, PAD records included."""
+    buf = ring.shared.shm.buf
+    write_pos = struct.unpack_from("<Q", buf, WRITE_POS_OFFSET)[0]
+    read_pos = struct.unpack_from("<Q", buf, READ_POS_OFFSET)[0]
+    records = []
+    while read_pos < write_pos:
+        offset = read_pos % ring.capacity
+        size, type_field, _, _, _ = RECORD_HEADER.unpack_from(buf, HEADER_SIZE + offset)
+        records.append((offset, type_field, size))
+        read_pos += size
+    struct.pack_into("<Q", buf, READ_POS_OFFSET, read_pos)
+    return records
+
+
+def test_encode_float():
+    record = encode_msg(MsgType.FLOAT, "freq", 220.0)
+    size, type_field, key_len, count, time = RECORD_HEADER.unpack_from(record)
+    assert size == len(record) and size % RECORD_ALIGN == 0
+    assert (type_field, key_len, count, time) == (int(MsgType.FLOAT), 4, 1, 0)
+    assert record[RECORD_HEADER.size:RECORD_HEADER.size + 4] == b"freq"
+    # the key is padded to 8 bytes, then the payload follows
+    assert struct.unpack_from("<d", record, RECORD_HEADER.size + 8)[0] == 220.0
+
+
+def test_encode_lists_and_strings():
+    record = encode_msg(MsgType.INTS, "steps", [1, -2, 3])
+    _, _, _, count, _ = RECORD_HEADER.unpack_from(record)
+    assert count == 3
+    assert struct.unpack_from("<3q", record, RECORD_HEADER.size + 8) == (1, -2, 3)
+
+    record = encode_msg(MsgType.STRINGS, "names", ["ab", "cde"])
+    _, _, _, count, _ = RECORD_HEADER.unpack_from(record)
+    assert count == 2
+    # each string is a UInt32 length and its bytes, padded to 4 bytes
+    assert record[RECORD_HEADER.size + 8:RECORD_HEADER.size + 24] == struct.pack("<I", 2) + b"ab\0\0" + struct.pack("<I", 3) + b"cde\0"
+
+    record = encode_msg(MsgType.TRIG, "go")
+    assert len(record) == RECORD_ALIGN * 2
+    assert RECORD_HEADER.unpack_from(record)[3] == 0
+
+
+def test_encode_handle_and_time():
+    record = encode_msg(MsgType.FLOAT, 7, 1.0, at=(1 << 32) + 5)
+    _, type_field, key_len, _, time = RECORD_HEADER.unpack_from(record)
+    assert type_field == int(MsgType.FLOAT) | HANDLE_FLAG | TIMED_FLAG
+    assert key_len == 4
+    assert struct.unpack_from("<I", record, RECORD_HEADER.size)[0] == 7
+    # only the low 32 bits of the sample clock are sent
+    assert time == 5
+
+
+def test_encode_rejects_unknown():
+    with pytest.raises(ValueError):
+        encode_msg(MsgType.PAD, "x")
+    with pytest.raises(ValueError):
+        ramp_values(1.0, 100, "log")
+    assert ramp_values(0.5, 99.6, "exp") == [0.5, 100.0, 1.0]
+
+
+def test_capacity_is_a_power_of_two():
+    ring = MessageRing(300)
+    assert ring.capacity == 512
+    ring.close()
+
+
+def test_wraparound_pads_the_tail(ring):
+    # 16 bytes of header, 16 of padded key and 8 of payload
+    record = encode_msg(MsgType.FLOAT, "frequency", 220.0)
+    assert len(record) == 48
+
+    for _ in range(5):
+        assert ring.write(record)
+    assert [offset for offset, _, _ in drain(ring)] == [0, 48, 96, 144, 192]
+
+    # 16 bytes are left before the end, too few for the record, so they are
+    # skipped with a PAD record and the record starts at the beginning again
+    assert ring.write(record)
+    assert drain(ring) == [(240, int(MsgType.PAD), 16), (0, int(MsgType.FLOAT), 48)]
+    assert struct.unpack_from("<Q", ring.shared.shm.buf, WRITE_POS_OFFSET)[0] == 304
+
+
+def test_full_ring_drops(ring, capsys):
+    record = encode_msg(MsgType.FLOAT, "frequency", 220.0)
+    for _ in range(5):
+        assert ring.write(record)
+    # 5 * 48 bytes are written, and the next record doesn't fit until the engine reads
+    assert not ring.write(record)
+    assert not ring.write(record)
+    assert "dropped 1 message" in capsys.readouterr().out
+    assert len(drain(ring)) == 5
+
+    assert ring.write(record)
+    assert [type_field for _, type_field, _ in drain(ring)] == [int(MsgType.PAD), int(MsgType.FLOAT)]
+
+
+def test_batched_write_is_one_block(ring):
+    batch = encode_msg(MsgType.BOOL, "on", True) + encode_msg(MsgType.INT, "n", 3)
+    assert ring.write(batch)
+    assert [type_field for _, type_field, _ in drain(ring)] == [int(MsgType.BOOL), int(MsgType.INT)]
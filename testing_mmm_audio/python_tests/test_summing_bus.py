@@ -0,0 +1,81 @@
+"""
+Tests of the block handoff between the bus workers and the master.
+"""
+import numpy as np
+import pytest
+
+from mmm_python.SummingBus import SummingBus
+
+
+@pytest.fixture
+def bus():
+    bus = SummingBus(num_workers=2, blocksize=4, num_channels=2, num_slots=2)
+    yield bus
+    bus.close()
+
+
+def render(bus: SummingBus, worker: int, value: float) -> bool:
+    """Render a block of `value` into the worker's next slot, as the bus worker loop does."""
+    slot = bus.next_block(worker)
+    if slot is None:
+        return False
+    slot[:] = value
+    bus.publish(worker)
+    return True
+
+
+def master_block(bus: SummingBus) -> np.ndarray:
+    out = np.full((bus.blocksize, 2), 0.25, dtype=np.float32)
+    bus.mix_into(out)
+    return out
+
+
+def test_blocks_are_summed_in_order(bus):
+    bus.set_active(0, True)
+    bus.set_active(1, True)
+    assert render(bus, 0, 1.0)
+    assert render(bus, 0, 2.0)
+    assert render(bus, 1, 10.0)
+
+    np.testing.assert_array_equal(master_block(bus), 11.25)
+    # worker 1 hasn't rendered the second block in time
+    np.testing.assert_array_equal(master_block(bus), 2.25)
+    assert (bus.misses(0), bus.misses(1)) == (0, 1)
+
+
+def test_worker_stays_within_the_slots(bus):
+    bus.set_active(0, True)
+    assert render(bus, 0, 1.0)
+    assert render(bus, 0, 2.0)
+    # both slots hold blocks the master hasn't played yet
+    assert bus.next_block(0) is None
+
+    master_block(bus)
+    assert render(bus, 0, 3.0)
+    np.testing.assert_array_equal(master_block(bus), 2.25)
+    np.testing.assert_array_equal(master_block(bus), 3.25)
+
+
+def test_late_worker_skips_ahead(bus):
+    bus.set_active(0, True)
+    for _ in range(3):
+        master_block(bus)
+    assert bus.misses(0) == 3
+
+    # the blocks the master already played are skipped, not rendered late
+    assert render(bus, 0, 1.0)
+    np.testing.assert_array_equal(master_block(bus), 1.25)
+    assert bus.misses(0) == 3
+
+
+def test_inactive_worker_is_not_missed(bus):
+    master_block(bus)
+    bus.set_active(0, True)
+    bus.set_active(0, False)
+    np.testing.assert_array_equal(master_block(bus), 0.25)
+    assert bus.misses(0) == 0
+
+    # a worker that becomes active starts at the master's current block
+    bus.set_active(0, True)
+    assert render(bus, 0, 1.0)
+    np.testing.assert_array_equal(master_block(bus), 1.25)